@@ -8,93 +8,458 @@ SCTG Development Non-Commercial License v1.0 (see LICENSE.md for details).
 
 import re
 import os
+import json
+import queue
+import atexit
+import base64
+import time
+import shutil
+import socket
+import hashlib
 import subprocess
 import tempfile
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def extract_mermaid_diagrams(markdown_content):
-    """Extrait les diagrammes Mermaid du contenu Markdown"""
-    pattern = r'```mermaid\n(.*?)\n```'
-    diagrams = re.findall(pattern, markdown_content, re.DOTALL)
-    return diagrams
-
-def create_mermaid_files(diagrams, temp_dir):
-    """Crée des fichiers .mmd temporaires pour chaque diagramme"""
-    diagram_files = []
-    for i, diagram in enumerate(diagrams):
-        mmd_file = os.path.join(temp_dir, f'diagram_{i}.mmd')
-        with open(mmd_file, 'w', encoding='utf-8') as f:
-            f.write(diagram.strip())
-        diagram_files.append(mmd_file)
-    return diagram_files
-
-def convert_mermaid_to_svg(mmd_files, temp_dir):
-    """Convertit les fichiers Mermaid en images SVG avec rendu du texte optimisé pour Word"""
-    svg_files = []
-    for mmd_file in mmd_files:
-        svg_file = mmd_file.replace('.mmd', '.svg')
-        svg_id = Path(svg_file).stem
+# Configuration Mermaid pour utiliser du texte SVG natif (pas HTML dans foreignObject)
+MERMAID_CONFIG = '{"htmlLabels": false, "fontFamily": "Arial"}'
+
+# Bloc de code Mermaid dans le Markdown, compilé une seule fois
+_MERMAID_RE = re.compile(r'```mermaid\n(.*?)\n```', re.DOTALL)
+# Marqueur laissé à la place de chaque diagramme par rewrite_with_placeholders
+_PLACEHOLDER_RE = re.compile(r'!\[Diagramme \d+\]\(__MERMAID_(\d+)__\)')
+
+# Cache disque des diagrammes déjà rendus, indexé par le hash de leur source
+MERMAID_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'rust-photoacoustic' / 'mermaid'
+MERMAID_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Délai maximal d'attente d'une réponse du serveur mmdc (démarrage ou diagramme suivant)
+MERMAID_WORKER_TIMEOUT = 60
+
+def rewrite_with_placeholders(markdown_content):
+    """Extrait les diagrammes Mermaid et les remplace par des marqueurs en une seule passe
+
+    Retourne le Markdown avec un marqueur ``__MERMAID_<i>__`` par diagramme et
+    la liste des sources Mermaid dans l'ordre du document.
+    """
+    diagrams = []
+
+    def replace_func(match):
+        diagrams.append(match.group(1).strip())
+        return f'![Diagramme {len(diagrams)}](__MERMAID_{len(diagrams) - 1}__)'
+
+    return _MERMAID_RE.sub(replace_func, markdown_content), diagrams
+
+def create_mermaid_files(diagrams, temp_dir, batch_index=0):
+    """Regroupe un lot de diagrammes dans un unique fichier Markdown pour mmdc"""
+    diagrams_md = os.path.join(temp_dir, f'diagrams_{batch_index}.md')
+    with open(diagrams_md, 'w', encoding='utf-8') as f:
+        for diagram in diagrams:
+            f.write(f"```mermaid\n{diagram.strip()}\n```\n\n")
+    return diagrams_md
+
+def convert_mermaid_to_svg(diagrams, temp_dir, indices=None):
+    """Convertit les diagrammes en images SVG avec mmdc, par lots rendus en parallèle
+
+    ``indices`` donne la position de chaque diagramme dans le document, pour les messages.
+
+    mmdc rend chaque bloc ```mermaid d'une entrée Markdown dans un fichier
+    numéroté (batch_0-1.svg, batch_0-2.svg, ...), ce qui évite de relancer
+    Node.js et Chromium pour chaque diagramme. Les diagrammes sont répartis en
+    autant de lots que de cœurs disponibles, chaque lot étant un appel mmdc.
+    """
+    # Configuration Mermaid partagée, écrite une seule fois pour tous les lots
+    config_file = os.path.join(temp_dir, 'mermaid_config.json')
+    with open(config_file, 'w', encoding='utf-8') as f:
+        f.write(MERMAID_CONFIG)
+
+    workers = min(len(diagrams), os.cpu_count() or 4)
+    batches = [list(range(batch_index, len(diagrams), workers)) for batch_index in range(workers)]
+
+    def _render_batch(batch_index):
+        """Rend un lot avec un appel mmdc et retourne les fichiers produits (None en cas d'échec)"""
+        indices = batches[batch_index]
+        diagrams_md = create_mermaid_files([diagrams[i] for i in indices], temp_dir, batch_index)
+        output_file = os.path.join(temp_dir, f'batch_{batch_index}.svg')
         try:
-            # Configuration Mermaid pour utiliser du texte SVG natif (pas HTML dans foreignObject)
-            config_file = mmd_file.replace('.mmd', '_config.json')
-            with open(config_file, 'w', encoding='utf-8') as f:
-                f.write('{"htmlLabels": false, "fontFamily": "Arial"}')
-            
             # Utiliser SVG avec configuration pour l'encodage UTF-8 et texte natif
             subprocess.run([
                 'mmdc',
-                '-i', mmd_file,
-                '-o', svg_file,
+                '-i', diagrams_md,
+                '-o', output_file,
                 '-c', config_file,
                 '--backgroundColor', 'transparent'
-            ], check=True, capture_output=True, env=dict(os.environ, LANG='C.UTF-8'))
-            svg_files.append(svg_file)
-            print(f"✅ Diagramme converti : {os.path.basename(svg_file)}")
+            ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+               env=dict(os.environ, LANG='C.UTF-8'))
         except subprocess.CalledProcessError as e:
-            print(f"❌ Erreur lors de la conversion de {mmd_file}: {e}")
-            svg_files.append(None)
+            print(f"❌ Erreur lors de la conversion du lot {batch_index}: {e}")
+
+        svg_files = []
+        for position in range(1, len(indices) + 1):
+            svg_file = os.path.join(temp_dir, f'batch_{batch_index}-{position}.svg')
+            svg_files.append(svg_file if os.path.exists(svg_file) else None)
+        return svg_files
+
+    svg_files = [None] * len(diagrams)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for indices, batch_files in zip(batches, executor.map(_render_batch, range(workers))):
+            for index, svg_file in zip(indices, batch_files):
+                svg_files[index] = svg_file
+
+    for index, svg_file in zip(indices or range(len(diagrams)), svg_files):
+        if svg_file is not None:
+            print(f"✅ Diagramme {index + 1} converti : {os.path.basename(svg_file)}")
+        else:
+            print(f"❌ Diagramme {index + 1} non converti")
     return svg_files
 
-def replace_mermaid_with_images(markdown_content, svg_files):
-    """Remplace les blocs Mermaid par des références d'images"""
-    pattern = r'```mermaid\n.*?\n```'
-    svg_index = 0
+class MermaidWorker:
+    """Processus Node.js persistant qui rend les diagrammes Mermaid à la demande
 
-    def replace_func(match):
-        nonlocal svg_index
-        if svg_index < len(svg_files) and svg_files[svg_index] is not None:
-            image_path = svg_files[svg_index]
+    Le navigateur headless n'est lancé qu'une seule fois par mmdc_server.mjs,
+    quel que soit le nombre de diagrammes ou de documents convertis.
+    """
+
+    SERVER_SCRIPT = Path(__file__).with_name('mmdc_server.mjs')
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            ['node', str(self.SERVER_SCRIPT)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=dict(os.environ, LANG='C.UTF-8'),
+            text=True,
+            encoding='utf-8'
+        )
+        # Les lignes du serveur sont lues par un thread, pour pouvoir les attendre avec un délai
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read_lines, daemon=True).start()
+        # Le serveur annonce qu'il est prêt une fois le navigateur lancé
+        try:
+            handshake = self._next_line()
+        except RuntimeError:
+            handshake = None
+        if not handshake or not json.loads(handshake).get('ready'):
+            self.kill()
+            raise RuntimeError("le serveur mmdc n'a pas démarré")
+
+    def _read_lines(self):
+        """Transmet les lignes du serveur à la file, puis None à la fin du flux"""
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _next_line(self):
+        """Ligne suivante du serveur ('' s'il s'est arrêté), RuntimeError passé le délai"""
+        try:
+            return self._lines.get(timeout=MERMAID_WORKER_TIMEOUT) or ''
+        except queue.Empty:
+            raise RuntimeError(f"pas de réponse du serveur mmdc depuis {MERMAID_WORKER_TIMEOUT} s") from None
+
+    def render(self, diagrams, temp_dir, output_format='svg', indices=None):
+        """Rend tous les diagrammes et retourne les chemins des images produites
+
+        ``indices`` donne la position de chaque diagramme dans le document, utilisée pour
+        nommer les fichiers et les messages. Lève RuntimeError si le serveur ne répond
+        plus ou dépasse le délai ; le worker ne doit alors plus être utilisé.
+        """
+        if indices is None:
+            indices = range(len(diagrams))
+        config = json.loads(MERMAID_CONFIG)
+        requests = [
+            json.dumps({
+                'id': i,
+                'source': diagram.strip(),
+                'format': output_format,
+                'config': config,
+                'backgroundColor': 'transparent'
+            }) + '\n'
+            for i, diagram in enumerate(diagrams)
+        ]
+        # Les requêtes sont écrites depuis un thread pendant que les réponses sont lues ici :
+        # le serveur répond au fil de l'eau, et écrire tout le lot avant de lire pourrait
+        # remplir les deux pipes et bloquer les deux processus
+        write_errors = []
+        writer = threading.Thread(target=self._write_requests, args=(requests, write_errors), daemon=True)
+        writer.start()
+
+        # Les réponses arrivent dans l'ordre de fin de rendu, indexées par id
+        image_files = [None] * len(diagrams)
+        for _ in diagrams:
+            line = self._next_line()
+            if not line:
+                raise RuntimeError("le serveur mmdc s'est arrêté de façon inattendue")
+            response = json.loads(line)
+            position = response['id']
+            number = indices[position] + 1
+            if 'error' in response:
+                print(f"❌ Erreur lors de la conversion du diagramme {number}: {response['error']}")
+                continue
+            image_file = os.path.join(temp_dir, f'diagram-{number}.{output_format}')
+            with open(image_file, 'wb') as f:
+                f.write(base64.b64decode(response['data']))
+            image_files[position] = image_file
+            print(f"✅ Diagramme converti : {os.path.basename(image_file)}")
+        writer.join()
+        if write_errors:
+            raise RuntimeError(f"envoi des diagrammes au serveur mmdc impossible : {write_errors[0]}")
+        return image_files
+
+    def _write_requests(self, requests, errors):
+        """Envoie les requêtes au serveur, en notant l'erreur si le pipe est fermé"""
+        try:
+            for request in requests:
+                self.process.stdin.write(request)
+            self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            errors.append(e)
+
+    def close(self):
+        """Arrête le serveur (fin de stdin) et attend la fermeture du navigateur"""
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.kill()
+
+    def kill(self):
+        """Arrête immédiatement le serveur et le navigateur, par exemple s'il ne répond plus"""
+        self.process.kill()
+        self.process.wait()
+
+_mermaid_worker = None
+
+def discard_mermaid_worker():
+    """Arrête le worker Mermaid partagé après une erreur ; le prochain appel en démarre un nouveau"""
+    global _mermaid_worker
+    if _mermaid_worker:
+        atexit.unregister(_mermaid_worker.close)
+        _mermaid_worker.kill()
+    _mermaid_worker = None
+
+def get_mermaid_worker():
+    """Retourne le worker Mermaid partagé, démarré au premier appel (None si indisponible)"""
+    global _mermaid_worker
+    if _mermaid_worker is None:
+        try:
+            _mermaid_worker = MermaidWorker()
+            atexit.register(_mermaid_worker.close)
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"⚠️  Serveur mmdc indisponible ({e}), utilisation de mmdc en ligne de commande")
+            _mermaid_worker = False
+    return _mermaid_worker or None
+
+def _diagram_cache_path(source, output_format='svg'):
+    """Chemin du rendu en cache d'un diagramme (hash de la source, de la configuration et du format)"""
+    digest = hashlib.blake2b(source.strip().encode('utf-8'), digest_size=16)
+    digest.update(MERMAID_CONFIG.encode('utf-8'))
+    digest.update(output_format.encode('utf-8'))
+    return MERMAID_CACHE_DIR / f'{digest.hexdigest()}.{output_format}'
+
+def _store_in_cache(image_file, cache_path):
+    """Copie un rendu dans le cache de façon atomique"""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_name(f'{cache_path.name}.{os.getpid()}.tmp')
+        shutil.copyfile(image_file, temp_path)
+        temp_path.replace(cache_path)
+    except OSError as e:
+        print(f"⚠️  Impossible d'écrire dans le cache Mermaid : {e}")
+
+def _prune_cache(max_bytes=MERMAID_CACHE_MAX_BYTES):
+    """Supprime les rendus les moins récemment utilisés au-delà de la taille maximale du cache"""
+    try:
+        entries = [(path.stat(), path) for path in MERMAID_CACHE_DIR.iterdir() if path.is_file()]
+    except OSError:
+        return
+    total = sum(stat.st_size for stat, _ in entries)
+    for stat, path in sorted(entries, key=lambda entry: entry[0].st_atime):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= stat.st_size
+
+def _render_uncached(diagrams, temp_dir, indices):
+    """Rend les diagrammes (aux positions ``indices`` du document) avec le worker persistant, ou mmdc en secours"""
+    worker = get_mermaid_worker()
+    if worker is not None:
+        try:
+            return worker.render(diagrams, temp_dir, indices=indices)
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"❌ Serveur mmdc hors service ({e}), utilisation de mmdc en ligne de commande")
+            discard_mermaid_worker()
+
+    return convert_mermaid_to_svg(diagrams, temp_dir, indices)
+
+def render_diagrams(diagrams, temp_dir):
+    """Rend les diagrammes en ne relançant Mermaid que pour ceux absents du cache disque"""
+    cache_paths = [_diagram_cache_path(diagram) for diagram in diagrams]
+    image_files = [None] * len(diagrams)
+    missing = []
+    for index, cache_path in enumerate(cache_paths):
+        if cache_path.exists():
+            image_file = os.path.join(temp_dir, f'cached-{index + 1}.svg')
+            shutil.copyfile(cache_path, image_file)
+            # Marquer l'entrée comme récemment utilisée pour l'éviction LRU
+            os.utime(cache_path)
+            image_files[index] = image_file
+            print(f"♻️  Diagramme {index + 1} lu depuis le cache")
+        else:
+            missing.append(index)
+
+    if missing:
+        rendered = _render_uncached([diagrams[index] for index in missing], temp_dir, missing)
+        for index, image_file in zip(missing, rendered):
+            image_files[index] = image_file
+            if image_file is not None:
+                _store_in_cache(image_file, cache_paths[index])
+        _prune_cache()
+
+    return image_files
+
+def deduplicate_diagrams(diagrams):
+    """Regroupe les diagrammes identiques pour ne rendre chaque source qu'une fois
+
+    Retourne les sources uniques et, pour chaque diagramme du document,
+    l'indice de sa source dans cette liste.
+    """
+    by_hash = {}
+    unique_sources = []
+    index_map = []
+    for diagram in diagrams:
+        digest = hashlib.blake2b(diagram.encode('utf-8'), digest_size=12).digest()
+        if digest not in by_hash:
+            by_hash[digest] = len(unique_sources)
+            unique_sources.append(diagram)
+        index_map.append(by_hash[digest])
+    return unique_sources, index_map
+
+def substitute_placeholders(markdown_content, svg_files):
+    """Remplace les marqueurs de diagrammes par les images rendues, en une seule passe"""
+    parts = []
+    last = 0
+    for match in _PLACEHOLDER_RE.finditer(markdown_content):
+        i = int(match.group(1))
+        parts.append(markdown_content[last:match.start()])
+        if svg_files[i] is not None:
             # Utiliser seulement le nom du fichier, pas le chemin complet
-            image_filename = os.path.basename(image_path)
-            svg_index += 1
-            return f'![Diagramme {svg_index}]({image_filename})'
+            parts.append(f'![Diagramme {i + 1}]({os.path.basename(svg_files[i])})')
         else:
-            svg_index += 1
-            return '[Diagramme non disponible]'
-    
-    return re.sub(pattern, replace_func, markdown_content, flags=re.DOTALL)
+            parts.append('[Diagramme non disponible]')
+        last = match.end()
+    parts.append(markdown_content[last:])
+    return ''.join(parts)
 
-def convert_to_docx(markdown_file, output_file, temp_dir):
-    """Convertit le fichier Markdown modifié en DOCX avec Pandoc"""
-    try:
-        # Changer vers le répertoire temporaire pour que les chemins relatifs fonctionnent
-        original_cwd = os.getcwd()
-        os.chdir(temp_dir)
-        
+_pandoc_server = None
+
+def _ensure_pandoc_server():
+    """Démarre pandoc en mode serveur au premier appel et retourne son URL (None si indisponible)"""
+    global _pandoc_server
+    if _pandoc_server is None:
+        _pandoc_server = False
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        # pandoc >= 3 expose le serveur via `pandoc server`, pandoc 2.19 via `pandoc-server`
+        for cmd in (['pandoc', 'server'], ['pandoc-server']):
+            try:
+                proc = subprocess.Popen(
+                    cmd + ['--port', str(port)],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+            except OSError:
+                continue
+            atexit.register(proc.terminate)
+            deadline = time.monotonic() + 10
+            while proc.poll() is None and time.monotonic() < deadline:
+                try:
+                    socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+                    _pandoc_server = f'http://127.0.0.1:{port}/'
+                    return _pandoc_server
+                except OSError:
+                    time.sleep(0.05)
+            proc.terminate()
+        print("⚠️  Serveur pandoc indisponible, utilisation de pandoc en ligne de commande")
+    return _pandoc_server or None
+
+def _convert_with_pandoc_server(url, markdown_content, output_file, temp_dir):
+    """Convertit le Markdown en DOCX via le serveur pandoc"""
+    # Le serveur n'accède pas au disque : les images lui sont envoyées avec la requête
+    files = {}
+    for name in os.listdir(temp_dir):
+        if name.endswith('.svg'):
+            with open(os.path.join(temp_dir, name), 'rb') as f:
+                files[name] = base64.b64encode(f.read()).decode('ascii')
+
+    request = urllib.request.Request(
+        url,
+        data=json.dumps({
+            'text': markdown_content,
+            'from': 'markdown',
+            'to': 'docx',
+            'files': files
+        }).encode('utf-8'),
+        headers={'Content-Type': 'application/json', 'Accept': 'application/json'}
+    )
+    with urllib.request.urlopen(request) as response:
+        result = json.load(response)
+
+    if 'output' not in result:
+        raise RuntimeError(result.get('error', result))
+    output = result['output']
+    with open(output_file, 'wb') as f:
+        f.write(base64.b64decode(output) if result.get('base64') else output.encode('utf-8'))
+
+def convert_to_docx(markdown_content, output_file, temp_dir):
+    """Convertit le contenu Markdown modifié en DOCX avec Pandoc"""
+    url = _ensure_pandoc_server()
+    if url is not None:
         try:
-            cmd = [
-                'pandoc',
-                os.path.basename(markdown_file),  # Utiliser seulement le nom du fichier
-                '-o', os.path.join(original_cwd, output_file),  # Chemin absolu pour la sortie
-                '--from', 'markdown',
-                '--to', 'docx'
-            ]
-            
-            subprocess.run(cmd, check=True)
+            _convert_with_pandoc_server(url, markdown_content, output_file, temp_dir)
             print(f"✅ Document DOCX créé : {output_file}")
             return True
-        finally:
-            os.chdir(original_cwd)  # Remettre le répertoire original
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"⚠️  Erreur du serveur pandoc ({e}), nouvel essai en ligne de commande")
+
+    try:
+        # Le Markdown est lu sur l'entrée standard, les images relatives dans temp_dir
+        cmd = [
+            'pandoc',
+            '--from', 'markdown',
+            '--to', 'docx',
+            '--resource-path', temp_dir,
+            '-o', os.path.abspath(output_file)
+        ]
+        
+        subprocess.run(cmd, input=markdown_content.encode('utf-8'), check=True)
+        print(f"✅ Document DOCX créé : {output_file}")
+        return True
+            
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Erreur lors de la conversion Pandoc : {e}")
+        return False
+
+def convert_to_docx_direct(input_file, output_file):
+    """Convertit directement le fichier Markdown d'origine en DOCX (aucun diagramme à rendre)"""
+    try:
+        cmd = [
+            'pandoc',
+            input_file,
+            '-o', output_file,
+            '--from', 'markdown',
+            '--to', 'docx',
+            # Résoudre les images relatives par rapport au document, pas au répertoire courant
+            '--resource-path', os.path.dirname(os.path.abspath(input_file))
+        ]
+        
+        subprocess.run(cmd, check=True)
+        print(f"✅ Document DOCX créé : {output_file}")
+        return True
             
     except subprocess.CalledProcessError as e:
         print(f"❌ Erreur lors de la conversion Pandoc : {e}")
@@ -127,37 +492,39 @@ def main():
     
     print(f"📖 Lecture du fichier : {input_file}")
     
-    # Créer un dossier temporaire automatiquement géré
-    with tempfile.TemporaryDirectory() as temp_dir:
-        print(f"📁 Dossier temporaire : {temp_dir}")
-        
-        # Extraire les diagrammes Mermaid
-        diagrams = extract_mermaid_diagrams(content)
-        print(f"🔍 {len(diagrams)} diagramme(s) Mermaid trouvé(s)")
-        
-        if diagrams:
-            # Créer les fichiers Mermaid
-            mmd_files = create_mermaid_files(diagrams, temp_dir)
+    # Extraire les diagrammes Mermaid et les remplacer par des marqueurs
+    modified_content, diagrams = rewrite_with_placeholders(content)
+    # Libérer le texte d'origine : seule la version réécrite est encore utile
+    del content
+    print(f"🔍 {len(diagrams)} diagramme(s) Mermaid trouvé(s)")
+    
+    if not diagrams:
+        # Rien à rendre : pandoc lit directement le fichier d'origine
+        success = convert_to_docx_direct(input_file, output_file)
+    else:
+        # Créer un dossier temporaire automatiquement géré
+        with tempfile.TemporaryDirectory() as temp_dir:
+            print(f"📁 Dossier temporaire : {temp_dir}")
             
-            # Convertir en SVG
-            svg_files = convert_mermaid_to_svg(mmd_files, temp_dir)
+            # Convertir en SVG, une seule fois par diagramme distinct
+            unique_sources, index_map = deduplicate_diagrams(diagrams)
+            if len(unique_sources) < len(diagrams):
+                print(f"🔁 {len(unique_sources)} diagramme(s) distinct(s) à rendre")
+            unique_files = render_diagrams(unique_sources, temp_dir)
+            svg_files = [unique_files[i] for i in index_map]
             
-            # Remplacer les diagrammes par des images
-            modified_content = replace_mermaid_with_images(content, svg_files)
-        else:
-            modified_content = content
-        
-        # Créer le fichier Markdown modifié
-        temp_md = os.path.join(temp_dir, 'temp_presentation.md')
-        with open(temp_md, 'w', encoding='utf-8') as f:
-            f.write(modified_content)
-        
-        # Convertir en DOCX
-        if convert_to_docx(temp_md, output_file, temp_dir):
-            print(f"\n🎉 Conversion terminée avec succès !")
-            print(f"📄 Fichier de sortie : {output_file}")
-        else:
-            print("\n❌ Échec de la conversion")
+            # Remplacer les marqueurs par des images
+            modified_content = substitute_placeholders(modified_content, svg_files)
+            del svg_files
+            
+            # Convertir en DOCX
+            success = convert_to_docx(modified_content, output_file, temp_dir)
+    
+    if success:
+        print(f"\n🎉 Conversion terminée avec succès !")
+        print(f"📄 Fichier de sortie : {output_file}")
+    else:
+        print("\n❌ Échec de la conversion")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
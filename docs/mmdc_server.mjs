@@ -0,0 +1,56 @@
+// Copyright (c) 2025 Ronan LE MEILLAT, SCTG Development
+// This file is part of the rust-photoacoustic project and is licensed under the
+// SCTG Development Non-Commercial License v1.0 (see LICENSE.md for details).
+//
+// Long-lived Mermaid renderer used by convert_to_docx.py.
+// Launches a single headless browser, then reads one JSON request per line on
+// stdin ({id, source, format, config, backgroundColor}) and answers with one
+// JSON line per diagram on stdout ({id, data} with base64 bytes, or {id, error}).
+import { execSync } from 'child_process';
+import { createRequire } from 'module';
+import path from 'path';
+import { createInterface } from 'readline';
+import { pathToFileURL } from 'url';
+
+// Use a local @mermaid-js/mermaid-cli install if there is one, otherwise the
+// global one installed with `npm install -g @mermaid-js/mermaid-cli`
+async function loadMermaidCli() {
+  try {
+    const require = createRequire(import.meta.url);
+    return { cli: await import('@mermaid-js/mermaid-cli'), require };
+  } catch {
+    const root = path.join(execSync('npm root -g').toString().trim(), '@mermaid-js', 'mermaid-cli');
+    const require = createRequire(path.join(root, 'package.json'));
+    const entry = pathToFileURL(path.join(root, 'src', 'index.js'));
+    return { cli: await import(entry.href), require };
+  }
+}
+
+const { cli, require } = await loadMermaidCli();
+const puppeteer = require('puppeteer');
+const browser = await puppeteer.launch({ headless: true });
+
+const send = (message) => process.stdout.write(JSON.stringify(message) + '\n');
+
+send({ ready: true });
+
+const pending = [];
+const lines = createInterface({ input: process.stdin });
+
+lines.on('line', (line) => {
+  if (!line.trim()) {
+    return;
+  }
+  const { id, source, format = 'svg', config = {}, backgroundColor = 'white' } = JSON.parse(line);
+  pending.push(
+    cli
+      .renderMermaid(browser, source, format, { backgroundColor, mermaidConfig: config })
+      .then(({ data }) => send({ id, data: Buffer.from(data).toString('base64') }))
+      .catch((error) => send({ id, error: String(error) })),
+  );
+});
+
+lines.on('close', async () => {
+  await Promise.all(pending);
+  await browser.close();
+});
@@ -11,6 +11,21 @@ Example usage:
 4. The driver will call your functions automatically
 """
 
+import bisect
+import os
+
+# Routine per-measurement output is only printed with PHOTOACOUSTIC_LOG_LEVEL=DEBUG,
+# so the hot path does not format and write several lines for every measurement
+DEBUG = os.environ.get("PHOTOACOUSTIC_LOG_LEVEL", "INFO").upper() == "DEBUG"
+
+# Concentration bands (ppm): above each threshold the next LED level applies
+LED_THRESHOLDS = (1000, 2000)
+LED_LEVELS = (
+    ("green", "🟢 LOW concentration - GREEN LED"),
+    ("yellow", "🟡 MEDIUM concentration - YELLOW LED"),
+    ("red", "🔴 HIGH concentration - RED LED"),
+)
+
 def initialize():
     """
     Called when the driver is first initialized.
@@ -44,24 +59,23 @@ def on_measurement(data):
     Returns:
         None or dict: Optional response data
     """
+    global measurement_count
+    measurement_count += 1
+    
     concentration = data['concentration_ppm']
     node_id = data['source_node_id']
     amplitude = data['peak_amplitude']
     frequency = data['peak_frequency']
     
-    print(f"📊 Measurement: {concentration:.1f} ppm from {node_id}")
-    print(f"   Amplitude: {amplitude:.3f}, Frequency: {frequency:.1f} Hz")
+    if DEBUG:
+        print(f"📊 Measurement: {concentration:.1f} ppm from {node_id}")
+        print(f"   Amplitude: {amplitude:.3f}, Frequency: {frequency:.1f} Hz")
     
     # Example: Control LEDs based on concentration
-    if concentration > 2000:
-        print("🔴 HIGH concentration - RED LED")
-        # control_led('red', True)
-    elif concentration > 1000:
-        print("🟡 MEDIUM concentration - YELLOW LED")
-        # control_led('yellow', True)
-    else:
-        print("🟢 LOW concentration - GREEN LED")
-        # control_led('green', True)
+    led, message = LED_LEVELS[bisect.bisect_left(LED_THRESHOLDS, concentration)]
+    if DEBUG:
+        print(message)
+    # control_led(led, True)
     
     # Example: Control external hardware
     if amplitude > 0.8:
@@ -74,7 +88,7 @@ def on_measurement(data):
     
     return {
         "processed": True,
-        "led_status": "green" if concentration < 1000 else "yellow" if concentration < 2000 else "red",
+        "led_status": led,
         "amplifier_active": amplitude > 0.8
     }
 
@@ -93,6 +107,9 @@ def on_alert(alert):
     Returns:
         None or dict: Optional response data
     """
+    global alert_count
+    alert_count += 1
+    
     alert_type = alert['alert_type']
     severity = alert['severity']
     message = alert['message']
@@ -155,9 +172,10 @@ def get_status():
     """
     Called to get current driver status.
     Return JSON-serializable data (dict, list, str, etc.)
+    Pre-encoded JSON can also be returned as bytes, e.g. orjson.dumps(status).
     
     Returns:
-        str or dict: Status information (JSON serializable)
+        dict, str or bytes: Status information (JSON serializable)
     """
     # Example: Check hardware status
     # led_status = check_led_status()
@@ -174,17 +192,15 @@ def get_status():
             "sensors": "connected"
         },
         "counters": {
-            "measurements_processed": getattr(get_status, 'measurement_count', 0),
-            "alerts_handled": getattr(get_status, 'alert_count', 0)
+            "measurements_processed": measurement_count,
+            "alerts_handled": alert_count
         },
         "uptime_seconds": 3600  # Example uptime
     }
     
-    # Return as JSON string or dict
-    import json
-    return json.dumps(status)
-    # OR simply return the dict:
-    # return status
+    # Return the dict directly: the driver converts it to JSON natively,
+    # so there is no need to serialize it with json.dumps first
+    return status
 
 def shutdown():
     """
@@ -227,8 +243,10 @@ def emergency_shutdown():
     # Implement emergency protocols here
 
 # Optional: Global variables and state
-measurement_count = 0
-alert_count = 0
+# The driver re-runs the script for every call, in a module of its own,
+# so carry the values over from this driver's previous call
+measurement_count = globals().get('measurement_count', 0)
+alert_count = globals().get('alert_count', 0)
 
 # Optional: Module-level initialization
 print("🐍 Python action module loaded")
@@ -259,6 +277,14 @@ class HardwareController:
 # Global hardware controller instance
 hw = HardwareController()
 
+# Response levels for the advanced handler: (level, LED color, ventilation %)
+RESPONSE_THRESHOLDS = (1500, 3000)
+RESPONSE_LEVELS = (
+    ("low", "green", 20),
+    ("medium", "yellow", 50),
+    ("high", "red", 100),   # Max ventilation
+)
+
 def advanced_measurement_handler(data):
     """Example of more sophisticated measurement processing"""
     global measurement_count
@@ -268,28 +294,17 @@ def advanced_measurement_handler(data):
     amplitude = data['peak_amplitude']
     
     # Multi-level response system
-    if concentration > 3000:
-        hw.set_led('red', True)
-        hw.set_led('yellow', False)
-        hw.set_led('green', False)
-        hw.set_ventilation(100)  # Max ventilation
-    elif concentration > 1500:
-        hw.set_led('red', False)
-        hw.set_led('yellow', True)
-        hw.set_led('green', False)
-        hw.set_ventilation(50)   # Medium ventilation
-    else:
-        hw.set_led('red', False)
-        hw.set_led('yellow', False)
-        hw.set_led('green', True)
-        hw.set_ventilation(20)   # Low ventilation
+    level, led, ventilation = RESPONSE_LEVELS[bisect.bisect_left(RESPONSE_THRESHOLDS, concentration)]
+    for color in ('red', 'yellow', 'green'):
+        hw.set_led(color, color == led)
+    hw.set_ventilation(ventilation)
     
     # Amplitude-based amplifier control
     hw.set_amplifier(amplitude > 0.7)
     
     return {
         "measurement_number": measurement_count,
-        "concentration_level": "high" if concentration > 3000 else "medium" if concentration > 1500 else "low",
+        "concentration_level": level,
         "hardware_state": {
             "leds": hw.led_states,
             "amplifier": hw.amplifier_active,
@@ -321,12 +336,30 @@ def send_to_cloud(data):
         return False
 
 # Example: Data analysis
-def analyze_trend(measurements):
-    if len(measurements) < 10:
+# Recent concentrations are kept in a fixed-size float32 ring buffer, fed from
+# on_measurement with record_concentration(data['concentration_ppm']).
+# The driver re-runs the script on every call, hence globals().get().
+RING_SIZE = 4096  # power of two so the cursor can be masked
+conc_ring = globals().get('conc_ring')
+if conc_ring is None:
+    conc_ring = np.empty(RING_SIZE, dtype=np.float32)
+ring_idx = globals().get('ring_idx', 0)
+
+def record_concentration(concentration):
+    global ring_idx
+    conc_ring[ring_idx & (RING_SIZE - 1)] = concentration
+    ring_idx += 1
+
+def analyze_trend(n=100):
+    n = min(n, ring_idx, RING_SIZE)
+    if n < 10:
         return "insufficient_data"
     
-    concentrations = [m['concentration_ppm'] for m in measurements]
-    trend = np.polyfit(range(len(concentrations)), concentrations, 1)[0]
+    # Last n samples in chronological order
+    y = conc_ring[np.arange(ring_idx - n, ring_idx) & (RING_SIZE - 1)]
+    # Closed-form least-squares slope over x = 0..n-1, same as np.polyfit(x, y, 1)[0]
+    x = np.arange(n, dtype=np.float32) - (n - 1) / 2
+    trend = float((x * (y - y.mean())).sum() / ((n * n * n - n) / 12))
     
     if trend > 50:
         return "increasing"
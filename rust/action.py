@@ -4,23 +4,85 @@
 # Enhanced Python script for photoacoustic action processing
 # This file demonstrates how to create custom actions for measurement processing
 
+import functools
 import json
+import os
+import sys
 import time
-from datetime import datetime
 
-# Global state for tracking measurements
-measurement_count = 0
-last_concentration = None
-start_time = time.time()
+# Per-measurement messages are only logged when PHOTOACOUSTIC_LOG_LEVEL=DEBUG
+LOG_LEVEL = os.environ.get("PHOTOACOUSTIC_LOG_LEVEL", "INFO").upper()
+DEBUG = LOG_LEVEL == "DEBUG"
+
+# Global state for tracking measurements. The driver re-executes this script on
+# every call, in a module of its own, so carry the values over from this driver's
+# previous run; initialize() resets them.
+measurement_count = globals().get("measurement_count", 0)
+last_concentration = globals().get("last_concentration")
+start_time = globals().get("start_time") or time.time()
+
+# Last formatted log timestamp as (epoch second, "HH:MM:SS").
+# The driver re-executes this script on every call, so keep the previous value.
+_ts_cache = globals().get("_ts_cache", (0, ""))
+
+def _hhmmss(timestamp):
+    """Timestamp as HH:MM:SS, formatted at most once per second"""
+    global _ts_cache
+    t = int(timestamp)
+    if _ts_cache[0] != t:
+        _ts_cache = (t, time.strftime('%H:%M:%S', time.localtime(t)))
+    return _ts_cache[1]
+
+# Log lines produced during a call, written out with a single write before the
+# entry point returns so that the driver's per-call stdout capture routes them to
+# the Rust log.
+_log_lines = []
+
+def _flush_log():
+    """Write all pending log lines to the current stdout with a single write"""
+    if _log_lines:
+        sys.stdout.write("".join(_log_lines))
+        _log_lines.clear()
+
+def _flushes_log(func):
+    """Decorator for entry points: flush the pending log lines when the call ends"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _flush_log()
+    return wrapper
+
+def _log(level, message):
+    now = time.time()
+    _log_lines.append(f"[PYTHON {level}] {_hhmmss(now)} - {message}\n")
+
+def log_debug(message):
+    """Helper function for per-measurement details, dropped unless DEBUG"""
+    if DEBUG:
+        _log("DEBUG", message)
 
 def log_info(message):
     """Helper function to ensure messages are visible"""
-    print(f"[PYTHON INFO] {datetime.now().strftime('%H:%M:%S')} - {message}")
+    _log("INFO", message)
 
 def log_warn(message):
     """Helper function for warning messages"""
-    print(f"[PYTHON WARN] {datetime.now().strftime('%H:%M:%S')} - {message}")
+    _log("WARN", message)
+
+# Result returned by on_measurement, updated in place instead of rebuilt per call.
+# The driver converts it to JSON before the next call, so it must not be retained.
+_RESULT_SCRATCH = globals().get("_RESULT_SCRATCH") or {
+    "processed": True,
+    "measurement_count": 0,
+    "concentration": 0.0,
+    "status": "normal",
+    "alert_needed": False,
+    "processing_time": 0.0
+}
 
+@_flushes_log
 def initialize():
     """Called when the driver is initialized"""
     global measurement_count, start_time
@@ -30,17 +92,20 @@ def initialize():
     log_info("Ready to process photoacoustic measurements")
     return {"status": "initialized", "timestamp": time.time()}
 
+@_flushes_log
 def on_measurement(data):
     """Called for each measurement - main processing logic"""
     global measurement_count, last_concentration
     
     measurement_count += 1
-    concentration = data.get("concentration_ppm", 0)
+    concentration = data["concentration_ppm"]
     last_concentration = concentration
-    node_id = data.get("source_node_id", "unknown")
     
-    log_info(f"Processing measurement #{measurement_count} from {node_id}")
-    log_info(f"Concentration: {concentration:.2f} ppm")
+    # Skip building the per-measurement messages unless they will be logged
+    if DEBUG:
+        node_id = data.get("source_node_id", "unknown")
+        log_debug(f"Processing measurement #{measurement_count} from {node_id}")
+        log_debug(f"Concentration: {concentration:.2f} ppm")
     
     # Custom processing logic
     status = "normal"
@@ -52,21 +117,22 @@ def on_measurement(data):
         log_warn(f"High concentration detected: {concentration:.2f} ppm")
     elif concentration < 10:
         status = "low"
-        log_info(f"Low concentration: {concentration:.2f} ppm")
+        if DEBUG:
+            log_debug(f"Low concentration: {concentration:.2f} ppm")
     
     # Additional processing can be added here
-    processing_result = {
-        "processed": True,
-        "measurement_count": measurement_count,
-        "concentration": concentration,
-        "status": status,
-        "alert_needed": alert_needed,
-        "processing_time": time.time()
-    }
+    result = _RESULT_SCRATCH
+    result["measurement_count"] = measurement_count
+    result["concentration"] = concentration
+    result["status"] = status
+    result["alert_needed"] = alert_needed
+    result["processing_time"] = time.time()
     
-    log_info(f"Measurement processed with status: {status}")
-    return processing_result
+    if DEBUG:
+        log_debug(f"Measurement processed with status: {status}")
+    return result
 
+@_flushes_log
 def on_alert(alert):
     """Called when an alert is triggered"""
     severity = alert.get("severity", "info")
@@ -86,6 +152,7 @@ def on_alert(alert):
         "action_taken": f"Logged {severity} alert"
     }
 
+@_flushes_log
 def get_status():
     """Return current status and statistics"""
     uptime = time.time() - start_time
@@ -102,6 +169,7 @@ def get_status():
     log_info(f"Status requested - {measurement_count} measurements processed, uptime: {uptime/60:.1f} min")
     return status_info
 
+@_flushes_log
 def shutdown():
     """Called when the driver is shutting down"""
     uptime = time.time() - start_time
@@ -115,6 +183,7 @@ def shutdown():
         "shutdown_time": time.time()
     }
 
+@_flushes_log
 def clear_action():
     """Clear any active actions and reset state"""
     global measurement_count
@@ -6,38 +6,174 @@
 
 use std::env;
 use std::fs;
+use std::ops::Range;
 use std::process;
 
-/// Recursively removes the "auto-initialize" feature from a pyo3 dependency in a TOML value.
+/// The feature to strip, as it appears (quoted) in a features array.
+const FEATURE: &str = "\"auto-initialize\"";
+
+/// Returns the byte index just past the end of the TOML key/value starting at `start`.
 ///
-/// # Arguments
-/// * `value` - A mutable reference to a TOML value (typically a pyo3 dependency table)
+/// The value ends at the first newline that is neither inside a string nor inside an
+/// inline table or array, so multi-line `features = [...]` arrays are spanned correctly.
+fn entry_end(content: &str, start: usize) -> usize {
+    let mut depth = 0usize;
+    let mut quote: Option<char> = None;
+    let mut escaped = false;
+    let mut comment = false;
+
+    for (i, c) in content[start..].char_indices() {
+        if comment {
+            if c == '\n' {
+                comment = false;
+                if depth == 0 {
+                    return start + i + 1;
+                }
+            }
+            continue;
+        }
+        if let Some(q) = quote {
+            if escaped {
+                escaped = false;
+            } else if c == '\\' && q == '"' {
+                escaped = true;
+            } else if c == q {
+                quote = None;
+            }
+            continue;
+        }
+        match c {
+            '"' | '\'' => quote = Some(c),
+            '#' => comment = true,
+            '{' | '[' => depth += 1,
+            '}' | ']' => depth = depth.saturating_sub(1),
+            '\n' if depth == 0 => return start + i + 1,
+            _ => {}
+        }
+    }
+    content.len()
+}
+
+/// Locates every pyo3 dependency entry in `[dependencies]` and `[workspace.dependencies]`.
 ///
-/// # Returns
-/// `true` if the feature was found and removed, `false` otherwise
+/// Both the inline form (`pyo3 = { ... }`) and the table form (`[dependencies.pyo3]`) are
+/// recognised. Each entry is returned with the section it belongs to and its byte range.
+fn find_pyo3_entries(content: &str) -> Vec<(&'static str, Range<usize>)> {
+    let mut entries = Vec::new();
+    let mut section: Option<&'static str> = None;
+    let mut table_entry: Option<(&'static str, usize)> = None;
+    let mut offset = 0;
+
+    while offset < content.len() {
+        let line_end = content[offset..]
+            .find('\n')
+            .map_or(content.len(), |i| offset + i + 1);
+        let line = content[offset..line_end].trim();
+
+        if line.starts_with('[') {
+            if let Some((label, start)) = table_entry.take() {
+                entries.push((label, start..offset));
+            }
+            let header: String = line
+                .trim_start_matches('[')
+                .split(']')
+                .next()
+                .unwrap_or("")
+                .chars()
+                .filter(|c| !c.is_whitespace())
+                .collect();
+            section = None;
+            match header.as_str() {
+                "dependencies" => section = Some("[dependencies]"),
+                "workspace.dependencies" => section = Some("[workspace.dependencies]"),
+                "dependencies.pyo3" => table_entry = Some(("[dependencies]", line_end)),
+                "workspace.dependencies.pyo3" => {
+                    table_entry = Some(("[workspace.dependencies]", line_end))
+                }
+                _ => {}
+            }
+        } else if let (Some(label), Some((key, _))) = (section, line.split_once('=')) {
+            if key.trim().trim_matches('"') == "pyo3" {
+                let end = entry_end(content, offset);
+                entries.push((label, offset..end));
+                offset = end;
+                continue;
+            }
+        }
+        offset = line_end;
+    }
+    if let Some((label, start)) = table_entry {
+        entries.push((label, start..content.len()));
+    }
+    entries
+}
+
+/// Removes every "auto-initialize" item from the features array(s) of a pyo3 entry.
+///
+/// Only the item and its separating comma are cut, so the surrounding layout and
+/// comments are preserved. An item that sits alone on its line has the whole line removed.
 ///
 /// # Example
 /// This function handles pyo3 entries like:
 /// ```toml
 /// pyo3 = { version = "0.27.2", optional = true, features = ["auto-initialize", "extension-module"] }
 /// ```
-fn remove_auto_initialize_from_value(value: &mut toml::Value) -> bool {
-    if let toml::Value::Table(table) = value {
-        if let Some(features_value) = table.get_mut("features") {
-            if let toml::Value::Array(features) = features_value {
-                let original_len = features.len();
-                features.retain(|item| {
-                    if let toml::Value::String(s) = item {
-                        s != "auto-initialize"
-                    } else {
-                        true
-                    }
-                });
-                return features.len() < original_len;
+fn remove_feature(entry: &str) -> String {
+    let mut out = entry.to_string();
+    while let Some(start) = out.find(FEATURE) {
+        let end = start + FEATURE.len();
+        let after = out[end..].trim_start_matches([' ', '\t']);
+        let cut = if let Some(rest) = after.strip_prefix(',') {
+            let comma_end = out.len() - rest.len();
+            let line_start = out[..start].rfind('\n').map_or(0, |i| i + 1);
+            let trailing = rest.trim_start_matches([' ', '\t', '\r']);
+            if out[line_start..start].trim().is_empty() && trailing.starts_with('\n') {
+                // `    "auto-initialize",` on its own line: drop the line
+                line_start..out.len() - trailing.len() + 1
+            } else {
+                let spaces = rest.len() - rest.trim_start_matches([' ', '\t']).len();
+                start..comma_end + spaces
+            }
+        } else {
+            // Last item: take the preceding separator with it, if any
+            let before = out[..start].trim_end();
+            if before.ends_with(',') {
+                before.len() - 1..end
+            } else {
+                start..end
             }
+        };
+        out.replace_range(cut, "");
+    }
+    out
+}
+
+/// Removes the "auto-initialize" feature from the pyo3 dependencies of a Cargo.toml.
+///
+/// The file is edited as text rather than parsed and re-serialized, so everything outside
+/// the pyo3 features arrays (comments, ordering, formatting) is left byte-for-byte intact.
+///
+/// # Returns
+/// The updated content and the sections in which the feature was removed
+fn remove_auto_initialize(content: &str) -> (String, Vec<&'static str>) {
+    let mut output = String::with_capacity(content.len());
+    let mut removed = Vec::new();
+    let mut last = 0;
+
+    for (section, range) in find_pyo3_entries(content) {
+        println!("✓ Found pyo3 in {}", section);
+        let entry = &content[range.clone()];
+        let cleaned = remove_feature(entry);
+        if cleaned.len() != entry.len() {
+            removed.push(section);
         }
+        output.push_str(&content[last..range.start]);
+        output.push_str(&cleaned);
+        last = range.end;
     }
-    false
+    output.push_str(&content[last..]);
+
+    (output, removed)
 }
 
 /// Main entry point for the `remove-auto-init` tool.
@@ -58,7 +194,7 @@ fn remove_auto_initialize_from_value(value: &mut toml::Value) -> bool {
 /// ```
 ///
 /// # Exit Codes
-/// - 0: Successfully processed the file
+/// - 0: Successfully processed the file (left as is when it has no "auto-initialize")
 /// - 1: Error reading/writing file or invalid arguments
 fn main() {
     let args: Vec<String> = env::args().collect();
@@ -79,49 +215,21 @@ fn main() {
         }
     };
 
-    // Parse the TOML using native TOML parser for robust handling of all format variations
-    let mut doc: toml::Value = match toml::from_str(&content) {
-        Ok(d) => d,
-        Err(e) => {
-            eprintln!("Error parsing TOML: {}", e);
-            process::exit(1);
-        }
-    };
-
-    let mut modified = false;
-
-    // Check [workspace.dependencies] section for pyo3 with auto-initialize feature
-    println!("DEBUG: Checking [workspace.dependencies]...");
-    if let Some(workspace) = doc.get_mut("workspace") {
-        if let Some(dependencies) = workspace.get_mut("dependencies") {
-            if let Some(pyo3) = dependencies.get_mut("pyo3") {
-                println!("✓ Found pyo3 in [workspace.dependencies]");
-                if remove_auto_initialize_from_value(pyo3) {
-                    println!("✓ Removed 'auto-initialize' from [workspace.dependencies].pyo3");
-                    modified = true;
-                }
-            }
-        }
+    // Nothing to do: skip the scan and leave the file (and its mtime) untouched
+    if !content.contains(FEATURE) {
+        println!("⚠ WARNING: 'auto-initialize' feature was not found or already removed");
+        return;
     }
 
-    // Check [dependencies] section for pyo3 with auto-initialize feature
-    println!("DEBUG: Checking [dependencies]...");
-    if let Some(dependencies) = doc.get_mut("dependencies") {
-        if let Some(pyo3) = dependencies.get_mut("pyo3") {
-            println!("✓ Found pyo3 in [dependencies]");
-            if remove_auto_initialize_from_value(pyo3) {
-                println!("✓ Removed 'auto-initialize' from [dependencies].pyo3");
-                modified = true;
-            }
-        }
-    }
+    let (output, removed) = remove_auto_initialize(&content);
 
-    if !modified {
+    for section in &removed {
+        println!("✓ Removed 'auto-initialize' from {}.pyo3", section);
+    }
+    if removed.is_empty() {
         println!("⚠ WARNING: 'auto-initialize' feature was not found or already removed");
     }
 
-    // Serialize the modified TOML document back to string and write to file
-    let output = toml::to_string_pretty(&doc).expect("Failed to serialize TOML");
     if let Err(e) = fs::write(cargo_toml_path, output) {
         eprintln!("Error writing {}: {}", cargo_toml_path, e);
         process::exit(1);
@@ -143,20 +251,14 @@ mod tests {
         // Write test file
         fs::write(&file_path, input).unwrap();
 
-        // Parse and modify
+        // Modify
         let content = fs::read_to_string(&file_path).unwrap();
-        let mut doc: toml::Value = toml::from_str(&content).unwrap();
-
-        // Remove from dependencies
-        if let Some(dependencies) = doc.get_mut("dependencies") {
-            if let Some(pyo3) = dependencies.get_mut("pyo3") {
-                remove_auto_initialize_from_value(pyo3);
-            }
-        }
-
-        let output = toml::to_string_pretty(&doc).unwrap();
+        let (output, _) = remove_auto_initialize(&content);
         println!("Output:\n{}", output);
 
+        // The edited file must still be valid TOML
+        toml::from_str::<toml::Value>(&output).expect("Output should be valid TOML");
+
         assert!(
             output.contains(expected_contains),
             "Output should contain: {}",
@@ -219,23 +321,9 @@ pyo3 = { version = "0.27.2", optional = true, features = [
     "extension-module",
 ], default-features = false }
 "#;
-        // Should not contain auto-initialize
-        let temp_dir = TempDir::new().unwrap();
-        let file_path = temp_dir.path().join("test_Cargo.toml");
-        fs::write(&file_path, input).unwrap();
-
-        let content = fs::read_to_string(&file_path).unwrap();
-        let mut doc: toml::Value = toml::from_str(&content).unwrap();
-
-        if let Some(dependencies) = doc.get_mut("dependencies") {
-            if let Some(pyo3) = dependencies.get_mut("pyo3") {
-                remove_auto_initialize_from_value(pyo3);
-            }
-        }
-
-        let output = toml::to_string_pretty(&doc).unwrap();
-        assert!(output.contains("extension-module"));
-        assert!(!output.contains("auto-initialize"));
+        let (output, removed) = remove_auto_initialize(input);
+        assert!(removed.is_empty());
+        assert_eq!(output, input);
     }
 
     /// Test that files without the auto-initialize feature are left unchanged.
@@ -252,4 +340,62 @@ pyo3 = { version = "0.27.2", optional = true, features = [
 "#;
         test_remove_feature(input, "extension-module", "auto-initialize");
     }
+
+    /// Test removing auto-initialize from [workspace.dependencies] when it is the last item.
+    #[test]
+    fn test_workspace_dependencies() {
+        let input = r#"
+[workspace.dependencies]
+pyo3 = { version = "0.27.2", features = ["extension-module", "auto-initialize"] }
+"#;
+        let (output, removed) = remove_auto_initialize(input);
+        assert_eq!(removed, vec!["[workspace.dependencies]"]);
+        assert!(output.contains(r#"features = ["extension-module"]"#));
+    }
+
+    /// Test removing auto-initialize from a `[dependencies.pyo3]` table.
+    #[test]
+    fn test_table_form_dependency() {
+        let input = r#"
+[dependencies.pyo3]
+version = "0.27.2"
+features = ["auto-initialize", "abi3"]
+
+[dev-dependencies]
+tempfile = "3"
+"#;
+        let (output, removed) = remove_auto_initialize(input);
+        assert_eq!(removed, vec!["[dependencies]"]);
+        assert!(output.contains(r#"features = ["abi3"]"#));
+    }
+
+    /// Test that only the feature item is removed and comments and layout are preserved.
+    #[test]
+    fn test_rest_of_file_untouched() {
+        let input = r#"# Project manifest
+[package]
+name = "demo"   # keep this comment
+
+[dependencies]
+# Python bindings
+pyo3 = { version = "0.27.2", features = [
+    "auto-initialize",
+    "abi3",   # stable ABI
+] }
+serde = { version = "1", features = ["derive"] }
+"#;
+        let expected = r#"# Project manifest
+[package]
+name = "demo"   # keep this comment
+
+[dependencies]
+# Python bindings
+pyo3 = { version = "0.27.2", features = [
+    "abi3",   # stable ABI
+] }
+serde = { version = "1", features = ["derive"] }
+"#;
+        let (output, _) = remove_auto_initialize(input);
+        assert_eq!(output, expected);
+    }
 }
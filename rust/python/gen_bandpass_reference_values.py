@@ -8,50 +8,62 @@ Ce script utilise scipy.signal pour générer des valeurs de référence qui ser
 Il génère des signaux de test avec différentes fréquences et calcule la réponse 
 du filtre scipy pour chaque configuration, puis sauvegarde les résultats en JSON
 pour les tests d'intégration Rust.
+
+Utiliser l'option --no-plot pour ne pas générer le graphique des réponses en
+fréquence (matplotlib n'est alors pas nécessaire).
 """
 
 import numpy as np
 import scipy.signal as signal
 import json
-import matplotlib.pyplot as plt
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# orjson écrit directement les tableaux NumPy, sans passer par des listes Python
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configuration des tests
 SAMPLE_RATE = 48000
 CENTER_FREQ = 1000.0  # Hz
 BANDWIDTH = 200.0     # Hz
 ORDERS = [2, 4, 6, 8, 10]
 SIGNAL_LENGTH = 1024  # Nombre d'échantillons
+DTYPE = np.float32    # Précision des signaux, identique à l'audio traité en Rust
 
 def create_test_signals():
     """Crée différents signaux de test pour valider le filtre"""
-    t = np.arange(SIGNAL_LENGTH) / SAMPLE_RATE
+    # Pulsation par échantillon, calculée une seule fois pour toutes les sinusoïdes
+    wt = DTYPE(2 * np.pi / SAMPLE_RATE) * np.arange(SIGNAL_LENGTH, dtype=DTYPE)
     
     signals = {}
     
     # Signal sinusoïdal à la fréquence centrale (devrait passer)
-    signals['center_freq'] = np.sin(2 * np.pi * CENTER_FREQ * t)
+    signals['center_freq'] = np.sin(CENTER_FREQ * wt)
     
     # Signal sinusoïdal dans la bande passante (devrait passer)
-    signals['in_band'] = np.sin(2 * np.pi * (CENTER_FREQ + BANDWIDTH/4) * t)
+    signals['in_band'] = np.sin((CENTER_FREQ + BANDWIDTH/4) * wt)
     
     # Signal sinusoïdal en dehors de la bande (devrait être atténué)
-    signals['out_of_band_low'] = np.sin(2 * np.pi * (CENTER_FREQ - BANDWIDTH) * t)
-    signals['out_of_band_high'] = np.sin(2 * np.pi * (CENTER_FREQ + BANDWIDTH) * t)
+    signals['out_of_band_low'] = np.sin((CENTER_FREQ - BANDWIDTH) * wt)
+    signals['out_of_band_high'] = np.sin((CENTER_FREQ + BANDWIDTH) * wt)
     
     # Signal à impulsion (pour tester la réponse impulsionnelle)
-    impulse = np.zeros(SIGNAL_LENGTH)
+    impulse = np.zeros(SIGNAL_LENGTH, dtype=DTYPE)
     impulse[0] = 1.0
     signals['impulse'] = impulse
     
     # Signal de bruit blanc (pour tester le filtrage du bruit)
-    np.random.seed(42)  # Pour la reproductibilité
-    signals['white_noise'] = np.random.normal(0, 0.1, SIGNAL_LENGTH)
+    rng = np.random.default_rng(42)  # Pour la reproductibilité
+    signals['white_noise'] = rng.standard_normal(SIGNAL_LENGTH, dtype=DTYPE) * DTYPE(0.1)
     
-    # Signal multi-fréquences
-    multi_freq = (np.sin(2 * np.pi * 500 * t) +      # En dessous de la bande
-                  np.sin(2 * np.pi * CENTER_FREQ * t) + # Dans la bande
-                  np.sin(2 * np.pi * 2000 * t))        # Au-dessus de la bande
+    # Signal multi-fréquences, accumulé sur place
+    multi_freq = np.sin(500 * wt)                    # En dessous de la bande
+    multi_freq += signals['center_freq']             # Dans la bande
+    multi_freq += np.sin(2000 * wt)                  # Au-dessus de la bande
     signals['multi_freq'] = multi_freq
     
     return signals
@@ -89,26 +101,49 @@ def design_scipy_bandpass_filter(order, center_freq, bandwidth, sample_rate):
     
     return sos
 
-def compute_frequency_response(sos, sample_rate, n_points=1024):
-    """Calcule la réponse en fréquence du filtre"""
-    w, h = signal.sosfreqz(sos, worN=n_points, fs=sample_rate)
-    return w.tolist(), np.abs(h).tolist(), np.angle(h).tolist()
+def compute_frequency_response(sos, sample_rate, n_points=512):
+    """
+    Calcule la réponse en fréquence du filtre sur une grille logarithmique
+    de 20 Hz à Nyquist, comme pour l'affichage en échelle log
+    """
+    worN = np.logspace(np.log10(20), np.log10(sample_rate / 2 - 1), n_points)
+    w, h = signal.sosfreqz(sos, worN=worN, fs=sample_rate)
+    return w, np.abs(h), np.angle(h)
+
+def process_signals_with_filter(names, signals, sos):
+    """
+    Traite tous les signaux de test avec le filtre scipy
+    
+    Args:
+        names: Noms des signaux, dans l'ordre des lignes de `signals`
+        signals: Tableau (n_signaux, SIGNAL_LENGTH) des signaux de test
+        sos: Sections du filtre au format Second-Order Sections
+    """
+    # Application du filtre avec sosfilt (recommandé pour la stabilité numérique),
+    # en un seul appel pour tous les signaux, avec les coefficients en double précision
+    # enregistrés dans sos_coefficients ; seule la sortie est ramenée à DTYPE
+    filtered = signal.sosfilt(sos, signals, axis=1).astype(DTYPE)
+    return {name: filtered[i] for i, name in enumerate(names)}
 
-def process_signals_with_filter(signals, sos):
-    """Traite tous les signaux de test avec le filtre scipy"""
-    processed = {}
+def _one_order(order, signal_names, signal_array):
+    """Conçoit le filtre d'un ordre donné et calcule ses données de référence"""
+    # Conception du filtre scipy
+    sos = design_scipy_bandpass_filter(order, CENTER_FREQ, BANDWIDTH, SAMPLE_RATE)
+    
+    # Calcul de la réponse en fréquence
+    freqs, magnitude, phase = compute_frequency_response(sos, SAMPLE_RATE)
     
-    for signal_name, signal_data in signals.items():
-        # Application du filtre avec sosfilt (recommandé pour la stabilité numérique)
-        filtered = signal.sosfilt(sos, signal_data)
-        processed[signal_name] = filtered.tolist()
+    # Traitement des signaux de test
+    processed_signals = process_signals_with_filter(signal_names, signal_array, sos)
     
-    return processed
+    return order, sos, freqs, magnitude, phase, processed_signals
 
 def generate_reference_data():
     """Génère toutes les données de référence pour tous les ordres"""
     print("Génération des signaux de test...")
     test_signals = create_test_signals()
+    signal_names = list(test_signals.keys())
+    signal_array = np.stack([test_signals[name] for name in signal_names])
     
     reference_data = {
         'config': {
@@ -117,39 +152,35 @@ def generate_reference_data():
             'bandwidth': BANDWIDTH,
             'signal_length': SIGNAL_LENGTH
         },
-        'test_signals': {name: data.tolist() for name, data in test_signals.items()},
+        'test_signals': test_signals,
         'filters': {}
     }
     
-    for order in ORDERS:
-        print(f"Traitement de l'ordre {order}...")
-        
-        # Conception du filtre scipy
-        sos = design_scipy_bandpass_filter(order, CENTER_FREQ, BANDWIDTH, SAMPLE_RATE)
-        
-        # Affichage des coefficients pour debug
-        print(f"  Coefficients SOS pour l'ordre {order}:")
-        for i, section in enumerate(sos):
-            b = section[:3]  # b0, b1, b2
-            a = section[3:]  # a0, a1, a2 (a0 normalisé à 1.0)
-            print(f"    Section {i}: b=[{b[0]:.6f}, {b[1]:.6f}, {b[2]:.6f}], a=[{a[0]:.6f}, {a[1]:.6f}, {a[2]:.6f}]")
+    # Les ordres sont indépendants : chacun est calculé dans un processus séparé
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(_one_order, ORDERS,
+                               [signal_names] * len(ORDERS), [signal_array] * len(ORDERS))
         
-        # Calcul de la réponse en fréquence
-        freqs, magnitude, phase = compute_frequency_response(sos, SAMPLE_RATE)
-        
-        # Traitement des signaux de test
-        processed_signals = process_signals_with_filter(test_signals, sos)
-        
-        # Stockage des résultats pour cet ordre
-        reference_data['filters'][f'order_{order}'] = {
-            'sos_coefficients': sos.tolist(),
-            'frequency_response': {
-                'frequencies': freqs,
-                'magnitude': magnitude,
-                'phase': phase
-            },
-            'processed_signals': processed_signals
-        }
+        for order, sos, freqs, magnitude, phase, processed_signals in results:
+            print(f"Traitement de l'ordre {order}...")
+            
+            # Affichage des coefficients pour debug
+            print(f"  Coefficients SOS pour l'ordre {order}:")
+            for i, section in enumerate(sos):
+                b = section[:3]  # b0, b1, b2
+                a = section[3:]  # a0, a1, a2 (a0 normalisé à 1.0)
+                print(f"    Section {i}: b=[{b[0]:.6f}, {b[1]:.6f}, {b[2]:.6f}], a=[{a[0]:.6f}, {a[1]:.6f}, {a[2]:.6f}]")
+            
+            # Stockage des résultats pour cet ordre
+            reference_data['filters'][f'order_{order}'] = {
+                'sos_coefficients': sos,
+                'frequency_response': {
+                    'frequencies': freqs,
+                    'magnitude': magnitude,
+                    'phase': phase
+                },
+                'processed_signals': processed_signals
+            }
     
     return reference_data
 
@@ -158,19 +189,26 @@ def save_reference_data(data, output_file):
     output_path = Path(output_file)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_path, 'w') as f:
-        json.dump(data, f, indent=2)
+    if orjson is not None:
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2))
+    else:
+        with open(output_path, 'w') as f:
+            json.dump(data, f, indent=2, default=lambda array: array.tolist())
     
     print(f"Données de référence sauvegardées dans: {output_path}")
 
 def plot_frequency_responses(reference_data):
     """Génère des graphiques de comparaison des réponses en fréquence"""
+    # Import coûteux, fait uniquement lorsqu'un graphique est demandé
+    import matplotlib.pyplot as plt
+    
     plt.figure(figsize=(12, 8))
     
     for order in ORDERS:
         filter_data = reference_data['filters'][f'order_{order}']
-        freqs = np.array(filter_data['frequency_response']['frequencies'])
-        magnitude = np.array(filter_data['frequency_response']['magnitude'])
+        freqs = filter_data['frequency_response']['frequencies']
+        magnitude = filter_data['frequency_response']['magnitude']
         
         # Conversion en dB
         magnitude_db = 20 * np.log10(np.maximum(magnitude, 1e-10))
@@ -195,6 +233,13 @@ def plot_frequency_responses(reference_data):
     
     plt.show()
 
+def nearest_index(freqs, freq):
+    """Indice de la fréquence la plus proche de `freq` dans la grille croissante `freqs`"""
+    idx = np.searchsorted(freqs, freq)
+    if idx == len(freqs) or (idx > 0 and freq - freqs[idx - 1] <= freqs[idx] - freq):
+        idx -= 1
+    return idx
+
 def validate_filter_performance(reference_data):
     """Valide que les filtres ont les caractéristiques attendues"""
     print("\nValidation des performances des filtres:")
@@ -202,16 +247,16 @@ def validate_filter_performance(reference_data):
     
     for order in ORDERS:
         filter_data = reference_data['filters'][f'order_{order}']
-        freqs = np.array(filter_data['frequency_response']['frequencies'])
-        magnitude = np.array(filter_data['frequency_response']['magnitude'])
+        freqs = filter_data['frequency_response']['frequencies']
+        magnitude = filter_data['frequency_response']['magnitude']
         
         # Trouver l'indice de la fréquence centrale
-        center_idx = np.argmin(np.abs(freqs - CENTER_FREQ))
+        center_idx = nearest_index(freqs, CENTER_FREQ)
         center_magnitude = magnitude[center_idx]
         
         # Trouver les indices des fréquences de coupure
-        low_cutoff_idx = np.argmin(np.abs(freqs - (CENTER_FREQ - BANDWIDTH/2)))
-        high_cutoff_idx = np.argmin(np.abs(freqs - (CENTER_FREQ + BANDWIDTH/2)))
+        low_cutoff_idx = nearest_index(freqs, CENTER_FREQ - BANDWIDTH/2)
+        high_cutoff_idx = nearest_index(freqs, CENTER_FREQ + BANDWIDTH/2)
         
         low_cutoff_magnitude = magnitude[low_cutoff_idx]
         high_cutoff_magnitude = magnitude[high_cutoff_idx]
@@ -229,10 +274,11 @@ def validate_filter_performance(reference_data):
         # Chercher la fréquence où l'atténuation est de -20dB
         target_magnitude = center_magnitude * 10**(-20/20)
         
-        # Côté bas
-        low_side_idx = np.where((freqs < CENTER_FREQ) & (magnitude < target_magnitude))
-        if len(low_side_idx[0]) > 0:
-            low_20db_freq = freqs[low_side_idx[0][-1]]
+        # Côté bas (fréquences strictement inférieures à Fc)
+        below_center = np.searchsorted(freqs, CENTER_FREQ)
+        low_side_idx = np.flatnonzero(magnitude[:below_center] < target_magnitude)
+        if low_side_idx.size > 0:
+            low_20db_freq = freqs[low_side_idx[-1]]
             low_slope_freq_range = (CENTER_FREQ - BANDWIDTH/2) - low_20db_freq
             if low_slope_freq_range > 0:
                 # Approximation de la pente: (20-3)/log10(freq_ratio)
@@ -256,8 +302,9 @@ if __name__ == "__main__":
     output_file = Path(__file__).parent / '../tests/data/bandpass_reference_values.json'
     save_reference_data(reference_data, output_file)
     
-    # Génération des graphiques
-    plot_frequency_responses(reference_data)
+    # Génération des graphiques (désactivée avec --no-plot)
+    if "--no-plot" not in sys.argv:
+        plot_frequency_responses(reference_data)
     
     print("\nGénération terminée avec succès!")
     print("Les données de référence sont prêtes pour les tests Rust.")
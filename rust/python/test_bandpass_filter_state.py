@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Check how scipy_bandpass_filter_optimized.py keeps state across the PythonNode's calls.
+
+The node executes the script again before every call, in a module namespace of
+its own, and the script carries its filter state over in that namespace. These
+tests run the script the same way, including a script reload with an edited
+filter design between two blocks.
+
+Run with pytest, or directly: python python/test_bandpass_filter_state.py
+
+Copyright (c) 2025 Ronan LE MEILLAT, SCTG Development
+This file is part of the rust-photoacoustic project and is licensed under the
+SCTG Development Non-Commercial License v1.0 (see LICENSE.md for details).
+"""
+
+import types
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from scipy import signal
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scipy_bandpass_filter_optimized.py"
+SAMPLE_RATE = 48000
+BLOCK_SIZE = 1024
+
+
+class ScriptNode:
+    """Runs the script like a PythonNode: re-executed before each call in its own namespace"""
+
+    def __init__(self, name, source=None, use_numba=True):
+        self.module = types.ModuleType(f"processor_{name}")
+        self.source = source or SCRIPT.read_text()
+        self.use_numba = use_numba
+
+    def call(self, function, *args):
+        exec(compile(self.source, str(SCRIPT), "exec"), self.module.__dict__)
+        if not self.use_numba:
+            self.module._sosfilt_df2t = None
+        return getattr(self.module, function)(*args)
+
+    def filter(self, block):
+        data = {
+            "type": "SingleChannel",
+            "samples": block,
+            "sample_rate": SAMPLE_RATE,
+            "timestamp": 0,
+            "frame_number": 0,
+        }
+        return self.call("process_data", data)["samples"]
+
+
+def with_order(order):
+    """Script source with FILTER_ORDER set to `order`"""
+    source = SCRIPT.read_text()
+    assert "\nFILTER_ORDER = 5 " in source
+    return source.replace("\nFILTER_ORDER = 5 ", f"\nFILTER_ORDER = {order} ", 1)
+
+
+def blocks(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.standard_normal(BLOCK_SIZE).astype(np.float32) for _ in range(count)]
+
+
+def test_filter_order_change_between_calls():
+    for use_numba in (True, False):
+        node = ScriptNode(f"reload_{use_numba}", use_numba=use_numba)
+        before, after = blocks(3), blocks(3, seed=1)
+        for block in before:
+            node.filter(block)
+
+        # Reload with a longer cascade: the stale state of the old design must not be reused
+        node.source = with_order(8)
+        reloaded = [node.filter(block) for block in after]
+
+        fresh = ScriptNode(f"fresh_{use_numba}", source=with_order(8), use_numba=use_numba)
+        expected = [fresh.filter(block) for block in after]
+        for got, want in zip(reloaded, expected):
+            assert np.all(np.isfinite(got))
+            np.testing.assert_allclose(got, want, rtol=1e-5, atol=1e-6)
+
+
+def test_kernels_shared_between_nodes():
+    first, second = ScriptNode("kernels_a"), ScriptNode("kernels_b")
+    first.filter(blocks(1)[0])
+    second.filter(blocks(1)[0])
+    assert first.module._KERNELS is second.module._KERNELS
+    assert first.module._sosfilt_df2t is second.module._sosfilt_df2t
+
+
+def test_filter_designed_once_across_reexecutions():
+    # A sample rate no other test uses, so the design is not already cached
+    sample_rate = 44_100
+    block = blocks(1)[0].astype(np.float64)
+    with mock.patch.object(signal, "butter", wraps=signal.butter) as butter:
+        first, second = ScriptNode("design_a"), ScriptNode("design_b")
+        for node in (first, second, first):
+            node.call("apply_filter_optimized", block, sample_rate)
+    assert butter.call_count == 1
+
+
+if __name__ == "__main__":
+    test_filter_order_change_between_calls()
+    test_kernels_shared_between_nodes()
+    test_filter_designed_once_across_reexecutions()
+    print("Filter state checks passed")
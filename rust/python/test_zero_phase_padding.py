@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Check the short constant padding used by the bandpass filter scripts in ZERO_PHASE mode.
+
+With ZERO_PHASE enabled, both scipy_bandpass_filter.py and
+scipy_bandpass_filter_optimized.py run sosfiltfilt with
+padtype='constant' and padlen=min(len - 1, 3 * n_sections). SciPy's default is a
+3 * (2 * n_sections + 1) odd extension. Each block is a slice of a longer
+recording, so the reference is the zero-phase output of the whole recording
+over the same slice. Averaged over the blocks of a recording, the short pad
+must not leave a larger error against that reference than the default padding
+does, within ERROR_TOLERANCE.
+
+Run with pytest, or directly: python python/test_zero_phase_padding.py
+
+Copyright (c) 2025 Ronan LE MEILLAT, SCTG Development
+This file is part of the rust-photoacoustic project and is licensed under the
+SCTG Development Non-Commercial License v1.0 (see LICENSE.md for details).
+"""
+
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+from scipy import signal
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+SAMPLE_RATE = 48000
+BLOCK_SIZE = 1024
+# Allowed ratio between the error of the short constant pad and that of the default padding
+ERROR_TOLERANCE = 1.1
+
+
+def load_script(name):
+    """Load a filter script as a module with ZERO_PHASE enabled"""
+    spec = importlib.util.spec_from_file_location(f"zero_phase_{name}", SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.ZERO_PHASE = True
+    return module
+
+
+def script_filters():
+    """(name, sos, filter function returning a float ndarray) for each script"""
+    basic = load_script("scipy_bandpass_filter")
+    optimized = load_script("scipy_bandpass_filter_optimized")
+    return [
+        ("scipy_bandpass_filter", basic.design_filter(SAMPLE_RATE),
+         lambda block: np.asarray(basic.apply_filter(block.tolist(), SAMPLE_RATE))),
+        ("scipy_bandpass_filter_optimized", optimized._design_filter_cached(SAMPLE_RATE).sos,
+         lambda block: optimized.apply_filter_optimized(block.astype(np.float32), SAMPLE_RATE)),
+    ]
+
+
+def recordings(sos):
+    """Long test recordings: white noise and a tone at the centre of the passband"""
+    rng = np.random.default_rng(42)
+    length = 32 * BLOCK_SIZE
+    low, high = (freq * SAMPLE_RATE / (2 * np.pi) for freq in _passband_edges(sos))
+    tone = np.sin(2 * np.pi * 0.5 * (low + high) * np.arange(length) / SAMPLE_RATE)
+    return [("noise", rng.standard_normal(length)), ("tone", tone)]
+
+
+def _passband_edges(sos):
+    """Angular frequencies (rad/sample) where the response is within 3 dB of its peak"""
+    w, h = signal.sosfreqz(sos, worN=8192)
+    gain = np.abs(h)
+    passband = np.flatnonzero(gain >= gain.max() / np.sqrt(2))
+    return w[passband[0]], w[passband[-1]]
+
+
+def block_errors(sos, apply_filter, recording):
+    """
+    Per-block (max, RMS) errors relative to the block's peak, for the script's
+    filter and for sosfiltfilt with its default padding, over every block of the recording
+    """
+    reference = signal.sosfiltfilt(sos, recording)
+    errors = []
+    for start in range(0, len(recording) - BLOCK_SIZE + 1, BLOCK_SIZE):
+        block = recording[start:start + BLOCK_SIZE]
+        expected = reference[start:start + BLOCK_SIZE]
+        peak = np.max(np.abs(expected))
+        script_error = np.abs(apply_filter(block) - expected) / peak
+        default_error = np.abs(signal.sosfiltfilt(sos, block) - expected) / peak
+        errors.append((script_error.max(), np.sqrt(np.mean(script_error ** 2)),
+                       default_error.max(), np.sqrt(np.mean(default_error ** 2))))
+    return np.array(errors)
+
+
+def test_constant_pad_edge_error_within_default_padding():
+    for name, sos, apply_filter in script_filters():
+        for kind, recording in recordings(sos):
+            # Single blocks vary either way, so compare the errors averaged over all blocks
+            max_error, rms_error, default_max_error, default_rms_error = \
+                block_errors(sos, apply_filter, recording).mean(axis=0)
+            assert max_error <= ERROR_TOLERANCE * default_max_error, \
+                f"{name}, {kind}: mean edge error {max_error:.3f} vs {default_max_error:.3f} with default padding"
+            assert rms_error <= ERROR_TOLERANCE * default_rms_error, \
+                f"{name}, {kind}: mean RMS error {rms_error:.3f} vs {default_rms_error:.3f} with default padding"
+
+
+if __name__ == "__main__":
+    test_constant_pad_edge_error_within_default_padding()
+    print("Constant padding edge error is within the default padding's")
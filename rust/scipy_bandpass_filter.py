@@ -6,7 +6,8 @@ for the PythonNode processing system.
 
 Features:
 - Butterworth bandpass filter (300Hz - 3000Hz)
-- Zero-phase filtering to avoid distortion
+- Single-pass causal filtering with the filter state carried across blocks,
+  or zero-phase filtering with ZERO_PHASE
 - Support for SingleChannel, DualChannel, and AudioFrame data
 - Automatic frequency validation
 
@@ -49,6 +50,21 @@ import json
 LOW_FREQ = 2000.5   # Low cutoff frequency in Hz
 HIGH_FREQ = 2201.0 # High cutoff frequency in Hz
 FILTER_ORDER = 5   # Butterworth filter order
+# Forward-backward (zero-phase) filtering costs about 3x a single pass and
+# needs the whole block; streaming nodes normally do not need it
+ZERO_PHASE = False
+
+# SOS coefficients already designed, keyed by (sample_rate, low, high, order).
+# The node re-executes this script on every call, so the cache is carried over
+# from the previous run instead of being reset here; the filter settings are part
+# of the key so that edited settings are picked up after a script reload.
+_SOS_CACHE = globals().get("_SOS_CACHE", {})
+
+# Filter delay lines carried from one block to the next in single-pass mode, keyed
+# by (sample_rate, LOW_FREQ, HIGH_FREQ, FILTER_ORDER, channel) with channel
+# 'single', 'A' or 'B'. Like the coefficients, they are kept across the node's
+# per-call re-executions, so consecutive blocks join without a start-up transient.
+_ZI_STATE = globals().get("_ZI_STATE", {})
 
 
 def initialize():
@@ -71,11 +87,16 @@ def initialize():
 def design_filter(sample_rate):
     """
     Design a Butterworth bandpass filter for the given sample rate.
+    The coefficients are computed once per sample rate and then reused.
     Args:
         sample_rate (float): The sample rate of the input signal in Hz.
     Returns:
         sos (ndarray): Second-order sections for the filter.
     """
+    key = (sample_rate, LOW_FREQ, HIGH_FREQ, FILTER_ORDER)
+    sos = _SOS_CACHE.get(key)
+    if sos is not None:
+        return sos
     nyquist = sample_rate / 2.0
     low_norm = LOW_FREQ / nyquist
     high_norm = HIGH_FREQ / nyquist
@@ -85,15 +106,19 @@ def design_filter(sample_rate):
     # Design Butterworth bandpass filter using SOS (Second-Order Sections)
     # SOS format is more numerically stable than transfer function
     sos = signal.butter(FILTER_ORDER, [low_norm, high_norm], btype='band', output='sos')
+    _SOS_CACHE[key] = sos
     return sos
 
 
-def apply_filter(samples, sample_rate):
+def apply_filter(samples, sample_rate, channel="single"):
     """
     Apply the bandpass filter to a list of samples.
+    In single-pass mode the filter state of the channel is carried over from
+    the previous block.
     Args:
         samples (list of float): Input audio samples.
         sample_rate (float): Sample rate in Hz.
+        channel (str): Channel the samples belong to ('single', 'A' or 'B').
     Returns:
         list of float: Filtered samples.
     """
@@ -101,8 +126,19 @@ def apply_filter(samples, sample_rate):
         return samples
     samples_array = np.array(samples, dtype=np.float64)
     sos = design_filter(sample_rate)
-    # Use sosfiltfilt for zero-phase filtering (no phase distortion)
-    filtered = signal.sosfiltfilt(sos, samples_array)
+    if ZERO_PHASE:
+        # Use sosfiltfilt for zero-phase filtering (no phase distortion),
+        # with a short constant pad instead of the default odd extension
+        padlen = min(len(samples_array) - 1, 3 * len(sos))
+        filtered = signal.sosfiltfilt(sos, samples_array, padtype='constant', padlen=padlen)
+    else:
+        # Single causal pass, continuing from the state left by the previous block
+        key = (sample_rate, LOW_FREQ, HIGH_FREQ, FILTER_ORDER, channel)
+        zi = _ZI_STATE.get(key)
+        if zi is None:
+            # Start from steady state for the first sample to avoid a step transient
+            zi = signal.sosfilt_zi(sos) * samples_array[0]
+        filtered, _ZI_STATE[key] = signal.sosfilt(sos, samples_array, zi=zi)
     return filtered.astype(np.float32).tolist()
 
 
@@ -132,8 +168,8 @@ def process_data(data):
         channel_a = data["channel_a"]
         channel_b = data["channel_b"]
         sample_rate = data["sample_rate"]
-        filtered_a = apply_filter(channel_a, sample_rate)
-        filtered_b = apply_filter(channel_b, sample_rate)
+        filtered_a = apply_filter(channel_a, sample_rate, "A")
+        filtered_b = apply_filter(channel_b, sample_rate, "B")
         return {
             "type": "DualChannel",
             "channel_a": filtered_a,
@@ -147,8 +183,8 @@ def process_data(data):
         channel_a = data["channel_a"]
         channel_b = data["channel_b"]
         sample_rate = data["sample_rate"]
-        filtered_a = apply_filter(channel_a, sample_rate)
-        filtered_b = apply_filter(channel_b, sample_rate)
+        filtered_a = apply_filter(channel_a, sample_rate, "A")
+        filtered_b = apply_filter(channel_b, sample_rate, "B")
         # Convert AudioFrame to DualChannel for further processing
         return {
             "type": "DualChannel",
@@ -184,6 +220,7 @@ def shutdown():
     Returns:
         dict: Shutdown status.
     """
+    _ZI_STATE.clear()
     print("SciPy bandpass filter shutting down")
     return {"status": "shutdown"}
 
@@ -195,7 +232,6 @@ def shutdown():
 # This is not used by the Rust node, but is useful for development.
 if __name__ == "__main__":
     # Test the filter with synthetic data
-    import matplotlib.pyplot as plt
     # Generate test signal: sum of 100Hz, 1000Hz, 5000Hz
     fs = 44100
     t = np.linspace(0, 1, fs, False)
@@ -208,6 +244,7 @@ if __name__ == "__main__":
     print(f"Filtered signal RMS: {np.sqrt(np.mean(np.array(filtered)**2)):.6f}")
     # Plot if matplotlib is available
     try:
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(12, 6))
         plt.subplot(2, 1, 1)
         plt.plot(t[:1000], signal_test[:1000])
@@ -14,19 +14,33 @@ SCTG Development Non-Commercial License v1.0 (see LICENSE.md for details).
 import numpy as np
 from scipy import signal
 import json
+import sys
+import threading
+import types
+from collections import namedtuple
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, scipy's sosfilt is used without it
+    njit = None
 
 # -----------------------------
 # Performance Optimization Guide
 # -----------------------------
 #
 # This optimized version demonstrates several performance techniques:
-# 1. Global filter cache to avoid recomputing SOS coefficients
+# 1. Filter cache to avoid recomputing SOS coefficients, filled on first use
+#    of each sample rate
 # 2. Pre-allocated numpy arrays when possible
 # 3. Minimal function call overhead
-# 4. Reduced type conversions
+# 4. Reduced type conversions: filtered samples are returned as float32
+#    NumPy arrays, which the PythonNode copies through the buffer protocol
+#    instead of converting a Python list element by element
 #
 # For maximum performance:
 # - Set auto_reload: false in config (avoids script reloading)
+# - Set numpy_arrays: true in config (samples arrive as float32 NumPy arrays,
+#   so no list is built on the way in and no conversion is needed here)
 # - Use fixed sample rates (enables filter caching)
 # - Minimize JSON serialization overhead
 # 
@@ -38,48 +52,89 @@ import json
 LOW_FREQ = 300.0   # Low cutoff frequency in Hz
 HIGH_FREQ = 3000.0 # High cutoff frequency in Hz
 FILTER_ORDER = 5   # Butterworth filter order
+# Forward-backward (zero-phase) filtering costs about 3x a single pass and
+# needs the whole block; streaming nodes normally do not need it
+ZERO_PHASE = False
+# Development check that samples arrive as C-contiguous float32 arrays, as they
+# do with numpy_arrays: true in the node configuration (see process_data)
+CHECK_INPUT = False
+
+# Designed filter: the (n_sections, 6) SOS array used by scipy, plus each
+# coefficient split into its own contiguous array (a0 is always 1) so the
+# kernel reads every coefficient with unit stride
+FilterCoefficients = namedtuple("FilterCoefficients", "sos b0 b1 b2 a1 a2")
 
-# Global filter cache - avoids recomputing coefficients
-_filter_cache = {}
 _initialized = False
 
+# Designed filters keyed by (sample_rate, LOW_FREQ, HIGH_FREQ, FILTER_ORDER).
+# Each node runs this script in its own module namespace, so the cache lives on a
+# process-wide module instead and is shared by every node running the script.
+# The designs never change once made; the lock keeps concurrent nodes from
+# designing the same filter twice.
+_shared = sys.modules.get("_scipy_bandpass_filter_shared")
+if _shared is None:
+    _shared = types.ModuleType("_scipy_bandpass_filter_shared")
+    _shared.filter_cache = {}
+    _shared.lock = threading.Lock()
+    sys.modules[_shared.__name__] = _shared
+_filter_cache = _shared.filter_cache
+_filter_cache_lock = _shared.lock
+
+# Filter delay lines carried from one block to the next, keyed by
+# (sample_rate, LOW_FREQ, HIGH_FREQ, FILTER_ORDER, channel) with channel
+# 'single', 'stereo', or 'A'/'B' when the two channels of a block differ in
+# length, so that a design edited before a script reload starts a new state. The node re-executes this
+# script on every call in its own module namespace, so the state from its
+# previous call is kept and belongs to this node only.
+_zi_state = globals().get("_zi_state", {})
+
 
 def initialize():
     """
     Initialize the optimized bandpass filter node.
-    Pre-computes filters for common sample rates.
+    Filters are designed on first use for each sample rate.
     """
-    global _initialized, _filter_cache
-    
-    # Pre-compute filters for common sample rates to reduce runtime overhead
-    common_sample_rates = [44100, 48000, 96000, 192000]
+    global _initialized
     
-    for sr in common_sample_rates:
-        _filter_cache[sr] = _design_filter_cached(sr)
+    # Compile the filter kernel now rather than on the first block.
+    # A bandpass design of order N is a cascade of N sections.
+    if _sosfilt_df2t is not None:
+        coeff = np.zeros(FILTER_ORDER)
+        _kernel_for(FILTER_ORDER)(coeff, coeff, coeff, coeff, coeff,
+                                  np.zeros((1, 1), dtype=np.float32), np.zeros((FILTER_ORDER, 1, 2)))
     
     _initialized = True
     
     print(f"Optimized SciPy bandpass filter initialized: {LOW_FREQ}Hz - {HIGH_FREQ}Hz, order {FILTER_ORDER}")
-    print(f"Pre-cached filters for sample rates: {common_sample_rates}")
     
     return {
         "status": "initialized", 
         "filter_type": "scipy_butterworth_bandpass_optimized",
         "low_freq": LOW_FREQ,
         "high_freq": HIGH_FREQ,
-        "order": FILTER_ORDER,
-        "cached_sample_rates": common_sample_rates
+        "order": FILTER_ORDER
     }
 
 
 def _design_filter_cached(sample_rate):
     """
-    Design and cache a Butterworth bandpass filter for the given sample rate.
-    This function is called once per sample rate and results are cached.
+    Return the Butterworth bandpass filter for the given sample rate and the
+    current configuration, designing it on first use.
+    Returns a FilterCoefficients tuple.
     """
-    if sample_rate in _filter_cache:
-        return _filter_cache[sample_rate]
-    
+    key = (sample_rate, LOW_FREQ, HIGH_FREQ, FILTER_ORDER)
+    coeffs = _filter_cache.get(key)
+    if coeffs is None:
+        with _filter_cache_lock:
+            coeffs = _filter_cache.get(key)
+            if coeffs is None:
+                coeffs = _design_filter(sample_rate)
+                _filter_cache[key] = coeffs
+    return coeffs
+
+
+def _design_filter(sample_rate):
+    """Design the Butterworth bandpass filter for the given sample rate."""
     nyquist = sample_rate / 2.0
     low_norm = LOW_FREQ / nyquist
     high_norm = HIGH_FREQ / nyquist
@@ -91,37 +146,182 @@ def _design_filter_cached(sample_rate):
     # Design Butterworth bandpass filter using SOS (Second-Order Sections)
     sos = signal.butter(FILTER_ORDER, [low_norm, high_norm], btype='band', output='sos')
     
-    # Cache the result
-    _filter_cache[sample_rate] = sos
-    return sos
+    # Keep the coefficients also stored column by column
+    return FilterCoefficients(
+        sos,
+        *(np.ascontiguousarray(sos[:, column]) for column in (0, 1, 2, 4, 5))
+    )
+
+
+def _sosfilt_df2t_kernel(b0, b1, b2, a1, a2, x, zi):
+    """
+    Cascaded biquads in transposed direct form II over a (channels, samples)
+    float32 block. Same sections and state layout as scipy's sosfilt along
+    axis 1: zi has shape (n_sections, channels, 2) and is updated in place.
+    """
+    y = np.empty_like(x)
+    n_sections = b0.shape[0]
+    for c in range(x.shape[0]):
+        for n in range(x.shape[1]):
+            v = x[c, n]
+            for s in range(n_sections):
+                out = b0[s] * v + zi[s, c, 0]
+                zi[s, c, 0] = b1[s] * v - a1[s] * out + zi[s, c, 1]
+                zi[s, c, 1] = b2[s] * v - a2[s] * out
+                v = out
+            y[c, n] = v
+    return y
+
+
+# Compiled once per process and kept on the shared module with the designed
+# filters, so nodes running this script and the per-call re-executions reuse it
+# (numba's on-disk cache needs a real source file, which the node does not provide);
+# recompiled only if the kernel itself was edited before a script reload
+_sosfilt_df2t = getattr(_shared, "sosfilt_df2t", None)
+if njit is not None and (
+    _sosfilt_df2t is None or _sosfilt_df2t.py_func.__code__ != _sosfilt_df2t_kernel.__code__
+):
+    _sosfilt_df2t = njit(fastmath=True, nogil=True)(_sosfilt_df2t_kernel)
+    _shared.sosfilt_df2t = _sosfilt_df2t
+
 
+# Largest cascade for which an unrolled kernel is generated
+_MAX_UNROLLED_SECTIONS = 12
 
-def apply_filter_optimized(samples, sample_rate):
+
+def _unrolled_kernel_source(n_sections):
+    """
+    Source of a DF2T kernel specialized for exactly n_sections biquads: the loop
+    over sections is written out and every coefficient and state value lives in
+    a local variable, so the whole cascade can stay in registers.
+    """
+    lines = [
+        f"def _sosfilt_df2t_{n_sections}(b0, b1, b2, a1, a2, x, zi):",
+        "    y = np.empty_like(x)",
+    ]
+    for s in range(n_sections):
+        lines.append(f"    b0_{s}, b1_{s}, b2_{s}, a1_{s}, a2_{s} = b0[{s}], b1[{s}], b2[{s}], a1[{s}], a2[{s}]")
+    lines.append("    for c in range(x.shape[0]):")
+    for s in range(n_sections):
+        lines.append(f"        z0_{s}, z1_{s} = zi[{s}, c, 0], zi[{s}, c, 1]")
+    lines += [
+        "        for n in range(x.shape[1]):",
+        "            v = x[c, n]",
+    ]
+    for s in range(n_sections):
+        lines += [
+            f"            out = b0_{s} * v + z0_{s}",
+            f"            z0_{s} = b1_{s} * v - a1_{s} * out + z1_{s}",
+            f"            z1_{s} = b2_{s} * v - a2_{s} * out",
+            "            v = out",
+        ]
+    lines.append("            y[c, n] = v")
+    for s in range(n_sections):
+        lines.append(f"        zi[{s}, c, 0], zi[{s}, c, 1] = z0_{s}, z1_{s}")
+    lines.append("    return y")
+    return "\n".join(lines) + "\n"
+
+
+# Unrolled kernels by number of sections, shared by every node like the generic
+# kernel and dropped if the generator was edited before a script reload
+if getattr(_shared, "kernels_generator", None) != _unrolled_kernel_source.__code__:
+    _shared.kernels = {}
+    _shared.kernels_generator = _unrolled_kernel_source.__code__
+_KERNELS = _shared.kernels
+
+
+def _kernel_for(n_sections):
+    """Numba kernel for a cascade of n_sections biquads (None without numba)."""
+    kernel = _KERNELS.get(n_sections)
+    if kernel is None:
+        if n_sections > _MAX_UNROLLED_SECTIONS:
+            return _sosfilt_df2t
+        namespace = {"np": np}
+        exec(_unrolled_kernel_source(n_sections), namespace)
+        kernel = njit(fastmath=True, nogil=True)(namespace[f"_sosfilt_df2t_{n_sections}"])
+        _KERNELS[n_sections] = kernel
+    return kernel
+
+
+def _filter_block(coeffs, block, key):
+    """
+    Filter a (channels, samples) float32 block along its last axis.
+    In single-pass mode the filter state is kept under `key` between calls.
+    """
+    if ZERO_PHASE:
+        # Short constant pad instead of the default odd extension
+        padlen = min(block.shape[1] - 1, 3 * coeffs.sos.shape[0])
+        return signal.sosfiltfilt(coeffs.sos, block, axis=1, padtype='constant', padlen=padlen)
+    
+    zi = _zi_state.get(key)
+    # The kernels do not check bounds, so never hand them a state of another shape
+    if zi is None or zi.shape != (coeffs.b0.shape[0], block.shape[0], 2):
+        # Start each channel from steady state for its first sample to avoid a step transient
+        zi = signal.sosfilt_zi(coeffs.sos)[:, None, :] * block[None, :, 0, None]
+    if _sosfilt_df2t is not None:
+        kernel = _kernel_for(coeffs.b0.shape[0])
+        filtered = kernel(coeffs.b0, coeffs.b1, coeffs.b2, coeffs.a1, coeffs.a2, block, zi)
+        _zi_state[key] = zi
+    else:
+        filtered, _zi_state[key] = signal.sosfilt(coeffs.sos, block, axis=1, zi=zi)
+    return filtered
+
+
+def _as_float32(samples):
+    """Samples as a float32 ndarray: no-op for float32 arrays, lists are converted once."""
+    samples_array = np.asarray(samples, dtype=np.float32)
+    if CHECK_INPUT:
+        assert samples is samples_array and samples_array.flags.c_contiguous, \
+            f"expected a contiguous float32 ndarray, got {type(samples).__name__}"
+    return samples_array
+
+
+def apply_filter_optimized(samples, sample_rate, channel="single"):
     """
     Apply the bandpass filter with maximum performance optimizations.
+    Accepts a list or an ndarray and returns a float32 ndarray, which the
+    PythonNode reads directly through the buffer protocol (no tolist()).
+    In single-pass mode the filter state of each channel is carried over
+    from the previous block, so consecutive blocks join without transients.
     """
     if len(samples) == 0:
         return samples
     
     # Get cached filter coefficients (very fast lookup)
-    sos = _design_filter_cached(sample_rate)
+    coeffs = _design_filter_cached(sample_rate)
     
-    # Convert to numpy array with optimal dtype
-    if isinstance(samples, list):
-        samples_array = np.array(samples, dtype=np.float32)
-    else:
-        samples_array = np.asarray(samples, dtype=np.float32)
+    samples_array = _as_float32(samples)
     
-    # Apply zero-phase filtering using cached coefficients
-    filtered = signal.sosfiltfilt(sos, samples_array)
+    key = (sample_rate, LOW_FREQ, HIGH_FREQ, FILTER_ORDER, channel)
+    filtered = _filter_block(coeffs, samples_array[None, :], key)[0]
     
-    # Return as list - this conversion is the main remaining bottleneck
-    return filtered.tolist()
+    # Hand the array back as is: the node copies it as one float32 buffer
+    return filtered.astype(np.float32, copy=False)
+
+
+def apply_filter_stereo(channel_a, channel_b, sample_rate):
+    """
+    Filter both channels of a stereo block with a single filter call.
+    Returns the two filtered channels as float32 ndarrays.
+    """
+    if len(channel_a) != len(channel_b) or len(channel_a) == 0:
+        return (apply_filter_optimized(channel_a, sample_rate, "A"),
+                apply_filter_optimized(channel_b, sample_rate, "B"))
+    
+    coeffs = _design_filter_cached(sample_rate)
+    stacked = np.stack([_as_float32(channel_a), _as_float32(channel_b)])
+    filtered = _filter_block(coeffs, stacked, (sample_rate, LOW_FREQ, HIGH_FREQ, FILTER_ORDER, "stereo"))
+    filtered = filtered.astype(np.float32, copy=False)
+    return filtered[0], filtered[1]
 
 
 def process_data(data):
     """
     Optimized main processing function with minimal overhead.
+    
+    Sample arrays ("samples", "channel_a", "channel_b") are expected as float32
+    NumPy arrays, which the node sends when configured with numpy_arrays: true.
+    Lists are still accepted but are converted on every call.
     """
     data_type = data.get("type")
     
@@ -129,19 +329,20 @@ def process_data(data):
     if data_type == "SingleChannel":
         return {
             "type": "SingleChannel",
-            "samples": apply_filter_optimized(data["samples"], data["sample_rate"]),
+            "samples": apply_filter_optimized(data["samples"], data["sample_rate"], "single"),
             "sample_rate": data["sample_rate"],
             "timestamp": data["timestamp"],
             "frame_number": data["frame_number"]
         }
     
-    # Fast path for DualChannel
+    # Fast path for DualChannel: both channels in one filter call
     elif data_type == "DualChannel":
         sample_rate = data["sample_rate"]
+        channel_a, channel_b = apply_filter_stereo(data["channel_a"], data["channel_b"], sample_rate)
         return {
             "type": "DualChannel",
-            "channel_a": apply_filter_optimized(data["channel_a"], sample_rate),
-            "channel_b": apply_filter_optimized(data["channel_b"], sample_rate),
+            "channel_a": channel_a,
+            "channel_b": channel_b,
             "sample_rate": sample_rate,
             "timestamp": data["timestamp"],
             "frame_number": data["frame_number"]
@@ -150,10 +351,11 @@ def process_data(data):
     # AudioFrame to DualChannel conversion
     elif data_type == "AudioFrame":
         sample_rate = data["sample_rate"]
+        channel_a, channel_b = apply_filter_stereo(data["channel_a"], data["channel_b"], sample_rate)
         return {
             "type": "DualChannel",
-            "channel_a": apply_filter_optimized(data["channel_a"], sample_rate),
-            "channel_b": apply_filter_optimized(data["channel_b"], sample_rate),
+            "channel_a": channel_a,
+            "channel_b": channel_b,
             "sample_rate": sample_rate,
             "timestamp": data["timestamp"],
             "frame_number": data["frame_number"]
@@ -172,16 +374,19 @@ def get_status():
         "high_freq": HIGH_FREQ,
         "filter_order": FILTER_ORDER,
         "cache_size": len(_filter_cache),
-        "cached_sample_rates": list(_filter_cache.keys()),
+        "cached_sample_rates": [key[0] for key in _filter_cache
+                                if key[1:] == (LOW_FREQ, HIGH_FREQ, FILTER_ORDER)],
         "initialized": _initialized,
+        "kernel": "numba" if _sosfilt_df2t is not None else "scipy",
         "description": f"Optimized Butterworth bandpass filter {LOW_FREQ}-{HIGH_FREQ}Hz, order {FILTER_ORDER}"
     }
 
 
 def shutdown():
-    """Shutdown the optimized filter and clear cache."""
-    global _filter_cache, _initialized
-    _filter_cache.clear()
+    """Shutdown the optimized filter and clear this node's filter state."""
+    global _initialized
+    # The designed filters are shared with other nodes and stay cached
+    _zi_state.clear()
     _initialized = False
     print("Optimized SciPy bandpass filter shutting down")
     return {"status": "shutdown"}
@@ -98,6 +98,14 @@
 //!         shutdown_function: shutdown  # Function to call on shutdown
 //!```
 //!
+//! # Script State
+//!
+//! The script is executed again before every call, in a module namespace that
+//! belongs to the driver (`action_script_<n>`, numbered as drivers are created).
+//! Module globals therefore persist from one call to the next when the script
+//! reads them back, e.g. `count = globals().get("count", 0)`, and are never
+//! shared with other drivers running the same script.
+//!
 //! # Usage Example
 //!
 //! ```rust,no_run
@@ -174,6 +182,7 @@ use log::{debug, error, info, warn};
 use serde_json::{json, Value};
 use std::collections::HashMap;
 use std::path::PathBuf;
+use std::sync::atomic::{AtomicU64, Ordering};
 use std::sync::{Arc, Mutex};
 use std::time::{Duration, SystemTime};
 
@@ -325,6 +334,8 @@ impl Default for PythonDriverConfig {
 /// ```
 pub struct PythonActionDriver {
     config: PythonDriverConfig,
+    /// Name of the Python module the script runs in, unique to this driver
+    module_name: String,
     last_modified: Arc<Mutex<Option<SystemTime>>>,
     history: Arc<Mutex<Vec<MeasurementData>>>,
     status: Arc<Mutex<String>>,
@@ -335,6 +346,7 @@ impl std::fmt::Debug for PythonActionDriver {
     fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
         f.debug_struct("PythonActionDriver")
             .field("config", &self.config)
+            .field("module_name", &self.module_name)
             .field("max_history", &self.max_history)
             .finish()
     }
@@ -368,8 +380,13 @@ impl PythonActionDriver {
     /// assert_eq!(driver.driver_type(), "python");
     /// ```
     pub fn new(config: PythonDriverConfig) -> Self {
+        // Each driver gets its own module so that script globals are not shared
+        static NEXT_MODULE_ID: AtomicU64 = AtomicU64::new(0);
+        let module_id = NEXT_MODULE_ID.fetch_add(1, Ordering::Relaxed);
+
         Self {
             config,
+            module_name: format!("action_script_{}", module_id),
             last_modified: Arc::new(Mutex::new(None)),
             history: Arc::new(Mutex::new(Vec::new())),
             status: Arc::new(Mutex::new("Not initialized".to_string())),
@@ -680,6 +697,7 @@ impl PythonActionDriver {
         use std::ffi::CString;
 
         let script_path = self.config.script_path.clone();
+        let module_name = self.module_name.clone();
         let timeout = Duration::from_secs(self.config.timeout_seconds);
         let func_name = func_name.to_string();
         let args = args.to_vec();
@@ -724,7 +742,7 @@ impl PythonActionDriver {
                                 e
                             ))
                         })?;
-                        let module_name = CString::new("action_script").map_err(|e| {
+                        let module_name = CString::new(module_name.as_str()).map_err(|e| {
                             pyo3::PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
                                 "Invalid module name: {}",
                                 e
@@ -808,6 +826,15 @@ impl PythonActionDriver {
                         ))
                     } else if let Ok(s) = result.extract::<String>(py) {
                         Ok(Value::String(s))
+                    } else if let Ok(bytes) = result.bind(py).extract::<&[u8]>() {
+                        // bytes are taken as already-encoded JSON (e.g. from orjson.dumps)
+                        Ok(serde_json::from_slice(bytes).unwrap_or_else(|_| {
+                            Value::String(String::from_utf8_lossy(bytes).into_owned())
+                        }))
+                    } else if let Ok(value) = pythonize::depythonize::<Value>(result.bind(py)) {
+                        // Dicts and lists map directly onto JSON, no need for
+                        // the script to serialize them with json.dumps first
+                        Ok(value)
                     } else {
                         // Try to convert to string representation
                         let str_repr = result.bind(py).str()?.to_string();
@@ -1378,6 +1405,9 @@ impl ActionDriver for PythonActionDriver {
     /// - Return any serializable value (dict, string, number, etc.)
     /// - Provide information about the script's internal state
     ///
+    /// A returned `bytes` object is parsed as JSON, so a script that already holds a
+    /// serialized payload (e.g. from `orjson.dumps`) can hand it over as is.
+    ///
     /// # Fallback Behavior
     ///
     /// If the Python status function doesn't exist or fails:
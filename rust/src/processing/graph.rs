@@ -1717,6 +1717,10 @@ impl ProcessingGraph {
                     python_config.output_type = Some(output_type.to_string());
                 }
 
+                if let Some(numpy_arrays) = params.get("numpy_arrays").and_then(|v| v.as_bool()) {
+                    python_config.numpy_arrays = numpy_arrays;
+                }
+
                 Ok(Box::new(PythonNode::new(config.id.clone(), python_config)))
             }
             "action_universal" => {
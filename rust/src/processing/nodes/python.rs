@@ -22,6 +22,10 @@
 //! - **Timeout Protection**: Configurable timeouts prevent hanging Python scripts
 //! - **Error Handling**: Robust error handling with detailed error messages
 //! - **Multiple Data Types**: Support for all ProcessingData variants
+//! - **NumPy Output**: Sample arrays may be returned as float32/float64 NumPy arrays,
+//!   read through the buffer protocol without a `.tolist()` round-trip
+//! - **NumPy Input**: With `numpy_arrays` enabled, sample arrays are passed to the
+//!   process function as float32 NumPy arrays instead of Python lists
 //! - **Sync Operation**: Synchronous processing for integration with the processing graph
 //!
 //! # Example Python Script
@@ -107,6 +111,14 @@
 //!     return {"status": "shutdown"}
 //! ```
 //!
+//! # Script State
+//!
+//! The script is executed again before every call, in a module namespace that
+//! belongs to the node (`processor_<node id>`). Module globals therefore persist
+//! from one call to the next when the script reads them back, e.g.
+//! `cache = globals().get("cache", {})`, and are never shared with other nodes
+//! running the same script.
+//!
 //! # Usage Example
 //!
 //! ```rust,no_run
@@ -162,6 +174,10 @@ use crate::acquisition::AudioFrame;
 #[cfg(feature = "python-driver")]
 use pyo3::prelude::*;
 
+/// Fields holding sample arrays, which scripts may receive and return as NumPy arrays
+#[cfg(feature = "python-driver")]
+const SAMPLE_FIELDS: [&str; 4] = ["samples", "channel_a", "channel_b", "signal"];
+
 /// Cached Python module to avoid recompilation overhead
 #[cfg(feature = "python-driver")]
 struct CachedPythonModule {
@@ -231,6 +247,9 @@ pub struct PythonNodeConfig {
     pub accepted_types: Vec<String>,
     /// Expected output data type (None means same as input)
     pub output_type: Option<String>,
+    /// Pass sample arrays to the process function as float32 NumPy arrays
+    /// instead of lists of Python floats (requires NumPy in the interpreter)
+    pub numpy_arrays: bool,
 }
 
 impl Default for PythonNodeConfig {
@@ -247,6 +266,7 @@ impl Default for PythonNodeConfig {
             python_paths: Vec::new(),
             accepted_types: Vec::new(),
             output_type: None,
+            numpy_arrays: false,
         }
     }
 }
@@ -472,6 +492,12 @@ impl PythonNode {
             }
         }
 
+        if let Some(numpy_arrays) = config.get("numpy_arrays") {
+            if let Some(enabled) = numpy_arrays.as_bool() {
+                node_config.numpy_arrays = enabled;
+            }
+        }
+
         Ok(Self::new(id, node_config))
     }
 
@@ -555,8 +581,10 @@ impl PythonNode {
             // Convert filename and module name to CString for PyO3 0.25+
             let filename =
                 CString::new("processor.py").map_err(|e| anyhow!("Invalid filename: {}", e))?;
-            let module_name =
-                CString::new("processor").map_err(|e| anyhow!("Invalid module name: {}", e))?;
+            // One module per node, so that state kept in the script's globals is not
+            // shared between nodes running the same script
+            let module_name = CString::new(format!("processor_{}", self.id))
+                .map_err(|e| anyhow!("Invalid module name: {}", e))?;
 
             // Create module from cached code (this is much faster than file I/O)
             let module = PyModule::from_code(
@@ -590,14 +618,25 @@ impl PythonNode {
                 // Initialize function takes no arguments
                 module.getattr(function_name)?.call0()?
             } else {
+                // Sample arrays bypass pythonize when they are handed over as NumPy arrays
+                let mut args = args;
+                let arrays =
+                    if self.config.numpy_arrays && function_name == self.config.process_function {
+                        Self::take_sample_arrays(&mut args)
+                    } else {
+                        Vec::new()
+                    };
                 // Convert arguments to Python
                 let py_args = pythonize::pythonize(py, &args)?;
+                if !arrays.is_empty() {
+                    Self::set_numpy_arrays(&py_args, arrays)?;
+                }
                 // Call the function with arguments
                 module.getattr(function_name)?.call1((py_args,))?
             };
 
             // Convert result back to JSON
-            let json_result: Value = pythonize::depythonize(&result)?;
+            let json_result = Self::depythonize_result(&result)?;
 
             // Check for timeout (simple approach)
             if start_time.elapsed() > Duration::from_secs(self.config.timeout_seconds) {
@@ -618,6 +657,100 @@ impl PythonNode {
         })
     }
 
+    /// Remove the sample fields (see [`SAMPLE_FIELDS`]) from the arguments, as f32 vectors
+    #[cfg(feature = "python-driver")]
+    fn take_sample_arrays(args: &mut Value) -> Vec<(&'static str, Vec<f32>)> {
+        let mut arrays = Vec::new();
+        if let Value::Object(map) = args {
+            for field in SAMPLE_FIELDS {
+                if !map.get(field).is_some_and(Value::is_array) {
+                    continue;
+                }
+                if let Some(Value::Array(values)) = map.remove(field) {
+                    let samples = values
+                        .iter()
+                        .map(|v| v.as_f64().unwrap_or(0.0) as f32)
+                        .collect();
+                    arrays.push((field, samples));
+                }
+            }
+        }
+        arrays
+    }
+
+    /// Add sample arrays to the Python arguments as float32 NumPy arrays
+    ///
+    /// Each array is built with `numpy.frombuffer` over a bytearray holding the samples,
+    /// so the data is copied once into Python and the array stays writable.
+    #[cfg(feature = "python-driver")]
+    fn set_numpy_arrays(
+        py_args: &Bound<'_, PyAny>,
+        arrays: Vec<(&'static str, Vec<f32>)>,
+    ) -> Result<()> {
+        use pyo3::types::{PyByteArray, PyDict};
+
+        let py = py_args.py();
+        let dict = py_args.extract::<Bound<'_, PyDict>>()?;
+        let frombuffer = py.import("numpy")?.getattr("frombuffer")?;
+        for (field, samples) in arrays {
+            let bytes: Vec<u8> = samples.iter().flat_map(|s| s.to_ne_bytes()).collect();
+            let array = frombuffer.call1((PyByteArray::new(py, &bytes), "float32"))?;
+            dict.set_item(field, array)?;
+        }
+        Ok(())
+    }
+
+    /// Convert a Python result to JSON, reading NumPy sample arrays through the buffer protocol
+    ///
+    /// Sample fields (see [`SAMPLE_FIELDS`]) returned as float32 or float64 buffers, such as
+    /// NumPy arrays, are copied in one go instead of being converted element by element, so
+    /// scripts can return their arrays without calling `.tolist()`. Lists and all other
+    /// fields still go through pythonize.
+    #[cfg(feature = "python-driver")]
+    fn depythonize_result(result: &Bound<'_, PyAny>) -> Result<Value> {
+        use pyo3::buffer::PyBuffer;
+        use pyo3::types::PyDict;
+
+        let Ok(dict) = result.extract::<Bound<'_, PyDict>>() else {
+            return Ok(pythonize::depythonize(result)?);
+        };
+
+        let py = result.py();
+        let mut arrays = Vec::new();
+        let mut rest: Option<Bound<'_, PyDict>> = None;
+        for field in SAMPLE_FIELDS {
+            let Some(value) = dict.get_item(field)? else {
+                continue;
+            };
+            let samples: Vec<f32> = if let Ok(buffer) = PyBuffer::<f32>::get(&value) {
+                buffer.to_vec(py)?
+            } else if let Ok(buffer) = PyBuffer::<f64>::get(&value) {
+                buffer.to_vec(py)?.into_iter().map(|v| v as f32).collect()
+            } else {
+                continue;
+            };
+            // Leave the arrays out of the dict handed to pythonize
+            if rest.is_none() {
+                rest = Some(dict.copy()?);
+            }
+            if let Some(rest) = &rest {
+                rest.del_item(field)?;
+            }
+            arrays.push((field, samples));
+        }
+
+        let mut json: Value = match &rest {
+            Some(rest) => pythonize::depythonize(rest.as_any())?,
+            None => pythonize::depythonize(result)?,
+        };
+        if let Value::Object(map) = &mut json {
+            for (field, samples) in arrays {
+                map.insert(field.to_string(), json!(samples));
+            }
+        }
+        Ok(json)
+    }
+
     /// Get module code, using cache when possible
     #[cfg(feature = "python-driver")]
     fn get_or_load_module_code(&self) -> Result<String> {
@@ -1100,6 +1233,7 @@ mod tests {
             ("auto_reload".to_string(), json!(true)),
             ("timeout_seconds".to_string(), json!(15)),
             ("process_function".to_string(), json!("my_process")),
+            ("numpy_arrays".to_string(), json!(true)),
         ]
         .into_iter()
         .collect();
@@ -1109,6 +1243,7 @@ mod tests {
         assert_eq!(node.config.auto_reload, true);
         assert_eq!(node.config.timeout_seconds, 15);
         assert_eq!(node.config.process_function, "my_process");
+        assert_eq!(node.config.numpy_arrays, true);
     }
 
     #[test]
@@ -1220,6 +1355,29 @@ mod tests {
         assert!(node.accepts_input(&dual_channel));
     }
 
+    #[cfg(feature = "python-driver")]
+    #[test]
+    fn test_take_sample_arrays() {
+        let mut args = json!({
+            "type": "DualChannel",
+            "channel_a": [0.5, -0.25],
+            "channel_b": [1.0, 0.0],
+            "sample_rate": 48000
+        });
+
+        let arrays = PythonNode::take_sample_arrays(&mut args);
+        assert_eq!(
+            arrays,
+            vec![
+                ("channel_a", vec![0.5, -0.25]),
+                ("channel_b", vec![1.0, 0.0])
+            ]
+        );
+        assert!(args.get("channel_a").is_none());
+        assert!(args.get("channel_b").is_none());
+        assert_eq!(args["sample_rate"], 48000);
+    }
+
     #[cfg(feature = "python-driver")]
     #[test]
     fn test_simple_python_script() {
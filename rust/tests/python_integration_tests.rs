@@ -312,6 +312,61 @@ mod python_integration_tests {
         Ok(())
     }
 
+    /// Script counting its measurements in a module global kept across re-executions
+    const MEASUREMENT_COUNTER_SCRIPT: &str = r#"
+measurements = globals().get("measurements", 0)
+
+def on_measurement(data):
+    global measurements
+    measurements += 1
+    return {"measurements": measurements}
+
+def get_status():
+    return {"measurements": measurements}
+"#;
+
+    #[tokio::test]
+    async fn test_python_driver_state_is_per_driver() -> Result<()> {
+        println!("🧪 Testing that drivers running the same script keep separate state...");
+
+        let temp_dir = tempfile::tempdir()?;
+        let script_path = temp_dir.path().join("counter_action.py");
+        std::fs::write(&script_path, MEASUREMENT_COUNTER_SCRIPT)?;
+
+        let make_driver = || {
+            PythonActionDriver::new(PythonDriverConfig {
+                script_path: script_path.clone(),
+                auto_reload: false,
+                timeout_seconds: 10,
+                ..Default::default()
+            })
+        };
+        let mut first = make_driver();
+        let mut second = make_driver();
+        first.initialize().await?;
+        second.initialize().await?;
+
+        for i in 0..3 {
+            first
+                .update_action(&create_test_measurement_data(
+                    100.0,
+                    &format!("first_{}", i),
+                ))
+                .await?;
+        }
+        second
+            .update_action(&create_test_measurement_data(200.0, "second_0"))
+            .await?;
+
+        let first_status = first.get_status().await?;
+        let second_status = second.get_status().await?;
+        assert_eq!(first_status["python_status"]["measurements"], 3);
+        assert_eq!(second_status["python_status"]["measurements"], 1);
+
+        println!("✅ Per-driver state test completed!");
+        Ok(())
+    }
+
     #[tokio::test]
     async fn test_python_driver_with_anaconda() -> Result<()> {
         println!("🧪 Testing Python driver with Anaconda environment...");
@@ -534,6 +534,64 @@ fn test_python_node_output_type_validation() -> Result<()> {
     Ok(())
 }
 
+/// Python script that counts its calls in a module global kept across re-executions
+const CALL_COUNTER_SCRIPT: &str = r#"
+calls = globals().get("calls", 0)
+
+def initialize():
+    return {"status": "initialized"}
+
+def process_data(data):
+    global calls
+    calls += 1
+    return {
+        "type": "SingleChannel",
+        "samples": [float(calls)],
+        "sample_rate": data["sample_rate"],
+        "timestamp": data["timestamp"],
+        "frame_number": data["frame_number"]
+    }
+"#;
+
+#[cfg(feature = "python-driver")]
+#[test]
+fn test_python_node_state_is_per_node() -> Result<()> {
+    let (_temp_dir, script_path) = create_test_script(CALL_COUNTER_SCRIPT);
+
+    let make_node = |id: &str| {
+        PythonNode::new(
+            id.to_string(),
+            PythonNodeConfig {
+                script_path: script_path.clone(),
+                auto_reload: false,
+                timeout_seconds: 10,
+                ..Default::default()
+            },
+        )
+    };
+    let mut node_a = make_node("counter_a");
+    let mut node_b = make_node("counter_b");
+
+    let input = || ProcessingData::SingleChannel {
+        samples: vec![0.0],
+        sample_rate: 44100,
+        timestamp: 1000,
+        frame_number: 1,
+    };
+    let call_count = |output: ProcessingData| match output {
+        ProcessingData::SingleChannel { samples, .. } => samples[0],
+        _ => panic!("Expected SingleChannel output"),
+    };
+
+    // Each node keeps its own module globals, even when running the same script
+    assert_eq!(call_count(node_a.process(input())?), 1.0);
+    assert_eq!(call_count(node_a.process(input())?), 2.0);
+    assert_eq!(call_count(node_b.process(input())?), 1.0);
+    assert_eq!(call_count(node_a.process(input())?), 3.0);
+
+    Ok(())
+}
+
 #[cfg(not(feature = "python-driver"))]
 #[test]
 fn test_python_node_without_feature() {
@@ -13,24 +13,107 @@ SCTG Development Non-Commercial License v1.0 (see LICENSE.md for details).
 """
 
 import json
+import math
+import os
 import time
 import sys
+from bisect import bisect_left, bisect_right, insort
 from collections import deque
-from statistics import mean, median
+
+import numpy as np
+
+# Status documents are encoded with orjson when it is installed
+try:
+    import orjson
+    
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, indent=2)
+
+# Set PYACTION_DEBUG in the environment to log the startup self-test details
+DEBUG = bool(os.environ.get("PYACTION_DEBUG"))
+
+# Mathematical self-test reported by initialize(): √16 + π
+_MATH_TEST = 4.0 + math.pi
+
+# Alert dispatch tables: log prefix by severity and response actions by alert type
+_ALERT_ICONS = {
+    "info": "[INFO]",
+    "warning": "[WARN]",
+    "critical": "[CRIT]"
+}
+_ALERT_ACTIONS = {
+    "concentration_high": ("increase_ventilation", "notify_operators"),
+    "sensor_fault": ("switch_backup_sensor", "schedule_maintenance"),
+    "calibration_needed": ("initiate_cal_sequence", "log_drift_data")
+}
+
+def _timestamp_seconds(timestamp, default):
+    """Timestamp as float seconds since the epoch, or `default` if it is missing or not numeric.
+
+    The Rust driver serializes SystemTime as {"secs_since_epoch": ..., "nanos_since_epoch": ...}.
+    """
+    if isinstance(timestamp, dict):
+        secs = timestamp.get("secs_since_epoch")
+        nanos = timestamp.get("nanos_since_epoch", 0)
+        if isinstance(secs, (int, float)) and isinstance(nanos, (int, float)):
+            return secs + nanos * 1e-9
+        return default
+    if isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool):
+        return float(timestamp)
+    return default
+
+class AlertRecord:
+    """Buffered alert; attribute slots instead of a per-alert dict."""
+    __slots__ = ("type", "severity", "message", "timestamp", "data")
+
+    def __init__(self, alert_type, severity, message, timestamp, data):
+        self.type = alert_type
+        self.severity = severity
+        self.message = message
+        self.timestamp = timestamp
+        self.data = data
+
+# The window sums are updated incrementally; every this many measurements they are
+# recomputed from the buffer so that floating-point error cannot build up over long runs
+SUM_RESYNC_INTERVAL = 1000
 
 # Advanced state management
 class ActionState:
-    def __init__(self):
+    def __init__(self, capacity=100):
         self.initialized = False
-        self.start_time = None
-        self.measurements = deque(maxlen=100)  # Keep last 100 measurements
+        self.start_time = None                 # time.monotonic() at initialize, for uptime only
+        # Last `capacity` measurements, stored field by field in ring buffers:
+        # `head` is the slot written next and `count` the number of valid slots
+        self.capacity = capacity
+        self.concentrations = np.zeros(capacity)
+        self.timestamps = np.zeros(capacity)
+        self.amplitudes = np.zeros(capacity)
+        self.frequencies = np.zeros(capacity)
+        self.sources = [None] * capacity
+        self.head = 0
+        self.count = 0
         self.alerts = deque(maxlen=50)         # Keep last 50 alerts
-        self.thresholds = {
+        self.alert_head = 0                    # Index of the oldest alert of the last 5 minutes
+        # Sliding-window aggregates over the buffered concentrations,
+        # updated as measurements enter and leave the window
+        self.concentration_sum = 0.0
+        self.recent_sum = 0.0                  # Sum of the last 5 concentrations
+        self.older_sum = 0.0                   # Sum of the 5 concentrations before those
+        self.updates_since_resync = 0          # Running-sum updates since the last resync_sums()
+        self.sorted_concentrations = []        # Window contents in ascending order (min, max, median)
+        # Persistence-based alerting: warn only after `kappa` consecutive
+        # high or critical measurements
+        self.run_length = 0
+        self.kappa = 3
+        self.set_thresholds({
             "low": 500.0,
             "medium": 1000.0,
             "high": 1500.0,
             "critical": 2000.0
-        }
+        })
         self.statistics = {
             "total_measurements": 0,
             "total_alerts": 0,
@@ -39,93 +122,182 @@ class ActionState:
             "max_concentration": None
         }
 
-# Global state instance
-state = ActionState()
+    def set_thresholds(self, thresholds):
+        """Set the level thresholds and rebuild the sorted lookup used by get_concentration_level."""
+        self.thresholds = dict(thresholds)
+        ordered = sorted(self.thresholds.items(), key=lambda item: item[1])
+        self.threshold_values = tuple(value for _, value in ordered)
+        self.threshold_levels = ("normal",) + tuple(level for level, _ in ordered)
+
+    def concentration_at(self, age):
+        """Buffered concentration `age` measurements back (1 is the newest)."""
+        return self.concentrations[(self.head - age) % self.capacity]
+
+    def add_measurement(self, concentration, timestamp, source, amplitude, frequency):
+        """Store a measurement and update the window aggregates, evicting the oldest one if full."""
+        # Convert and store the measurement before touching any aggregate, so that
+        # invalid input leaves the state unchanged
+        concentration = float(concentration)
+        timestamp = float(timestamp)
+        amplitude = float(amplitude)
+        frequency = float(frequency)
+        head = self.head
+        evicted = self.concentrations[head] if self.count == self.capacity else None
+        # The 5th newest value moves from the recent to the older trend window,
+        # and the 10th newest leaves the older one
+        moved = self.concentration_at(5) if self.count >= 5 else 0.0
+        dropped = self.concentration_at(10) if self.count >= 10 else 0.0
+        
+        self.concentrations[head] = concentration
+        self.timestamps[head] = timestamp
+        self.amplitudes[head] = amplitude
+        self.frequencies[head] = frequency
+        self.sources[head] = source
+        
+        if evicted is not None:
+            self.concentration_sum -= evicted
+            del self.sorted_concentrations[bisect_left(self.sorted_concentrations, evicted)]
+        self.concentration_sum += concentration
+        insort(self.sorted_concentrations, concentration)
+        self.recent_sum += concentration - moved
+        self.older_sum += moved - dropped
+        
+        self.head = (head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        
+        self.updates_since_resync += 1
+        if self.updates_since_resync >= SUM_RESYNC_INTERVAL:
+            self.resync_sums()
+
+    def resync_sums(self):
+        """Recompute the running sums from the buffer, dropping accumulated rounding error."""
+        # Valid slots are [0, count) whether or not the ring has wrapped
+        self.concentration_sum = float(self.concentrations[:self.count].sum())
+        newest = self.concentrations[(self.head - np.arange(1, min(self.count, 10) + 1)) % self.capacity]
+        self.recent_sum = float(newest[:5].sum())
+        self.older_sum = float(newest[5:].sum())
+        self.updates_since_resync = 0
+
+    def median_concentration(self):
+        values = self.sorted_concentrations
+        middle = len(values) // 2
+        if len(values) % 2:
+            return values[middle]
+        return (values[middle - 1] + values[middle]) / 2
+
+# Global state instance. The driver re-executes this script on every call, in
+# a module of its own, so keep the instance (and its window aggregates) from
+# this driver's previous call, unless the state classes were edited before a
+# script reload.
+_state_code = tuple(
+    member.__code__
+    for cls in (ActionState, AlertRecord)
+    for member in vars(cls).values()
+    if hasattr(member, "__code__")
+)
+state = globals().get("state")
+if state is None or globals().get("_STATE_CODE") != _state_code:
+    state = ActionState()
+_STATE_CODE = _state_code
 
 def initialize():
     """Initialize the advanced action script."""
+    global state
     try:
-        print("[INIT] Advanced Python action script initializing...")
-        
+        now = time.time()
+        # A new driver starts from empty buffers and statistics
+        state = ActionState()
         state.initialized = True
-        state.start_time = time.time()
+        state.start_time = time.monotonic()
         
-        # Test if we can use mathematical operations
-        import math
-        test_calculation = math.sqrt(16) + math.pi
-        
-        print(f"[MATH] Math test passed: √16 + π = {test_calculation:.3f}")
-        print(f"[PYTHON] Python version: {sys.version}")
-        print(f"[BUFFERS] Buffer sizes: measurements={state.measurements.maxlen}, alerts={state.alerts.maxlen}")
+        if DEBUG:
+            sys.stdout.write(
+                "[INIT] Advanced Python action script initializing...\n"
+                f"[MATH] Math test passed: √16 + π = {_MATH_TEST:.3f}\n"
+                f"[PYTHON] Python version: {sys.version}\n"
+                f"[BUFFERS] Buffer sizes: measurements={state.capacity}, alerts={state.alerts.maxlen}\n"
+            )
         
         return {
             "status": "ready",
             "python_version": sys.version,
-            "math_test": test_calculation,
-            "timestamp": time.time(),
+            "math_test": _MATH_TEST,
+            "timestamp": now,
             "features": ["statistics", "thresholds", "buffering"]
         }
     except Exception as e:
         print(f"[ERROR] Initialization error: {e}")
         return {"status": "error", "error": str(e)}
 
-def on_measurement(data):
+def on_measurement(data, _time=time.time, _round=round):
     """Process measurement data with advanced analytics."""
     try:
-        state.statistics["total_measurements"] += 1
+        now = _time()
+        stats = state.statistics
         concentration = data["concentration_ppm"]
         
         # Add to buffer
-        measurement_record = {
-            "concentration": concentration,
-            "timestamp": data.get("timestamp", time.time()),
-            "source": data.get("source_node_id", "unknown"),
-            "amplitude": data.get("peak_amplitude", 0.0),
-            "frequency": data.get("peak_frequency", 0.0)
-        }
-        state.measurements.append(measurement_record)
-        
-        # Update statistics
-        concentrations = [m["concentration"] for m in state.measurements]
-        state.statistics["avg_concentration"] = mean(concentrations)
-        state.statistics["min_concentration"] = min(concentrations)
-        state.statistics["max_concentration"] = max(concentrations)
-        
-        # Determine concentration level
+        state.add_measurement(
+            concentration,
+            _timestamp_seconds(data.get("timestamp"), now),
+            data.get("source_node_id", "unknown"),
+            data.get("peak_amplitude", 0.0),
+            data.get("peak_frequency", 0.0)
+        )
+        stats["total_measurements"] += 1
+        count = state.count
+        
+        # Update statistics from the window aggregates
+        stats["avg_concentration"] = state.concentration_sum / count
+        stats["min_concentration"] = state.sorted_concentrations[0]
+        stats["max_concentration"] = state.sorted_concentrations[-1]
+        
+        # Determine concentration level, and whether it has stayed high for long enough to warn
         level = get_concentration_level(concentration)
+        if level == "high" or level == "critical":
+            state.run_length += 1
+        else:
+            state.run_length = 0
+        warn = state.run_length >= state.kappa
         
         # Calculate trends (if we have enough data)
         trend = "stable"
-        if len(state.measurements) >= 5:
-            recent_avg = mean([m["concentration"] for m in list(state.measurements)[-5:]])
-            older_avg = mean([m["concentration"] for m in list(state.measurements)[-10:-5]]) if len(state.measurements) >= 10 else recent_avg
+        if count >= 5:
+            recent_avg = state.recent_sum / 5
+            older_avg = state.older_sum / 5 if count >= 10 else recent_avg
             
             if recent_avg > older_avg * 1.1:
                 trend = "rising"
             elif recent_avg < older_avg * 0.9:
                 trend = "falling"
         
-        print(f"[MEASUREMENT] #{state.statistics['total_measurements']}: {concentration:.2f} ppm [{level}] - Trend: {trend}")
-        print(f"[STATS] Stats: avg={state.statistics['avg_concentration']:.1f}, min={state.statistics['min_concentration']:.1f}, max={state.statistics['max_concentration']:.1f}")
+        # Log every 10th measurement, and every one that raises a warning, with
+        # a single write; sys.stdout is looked up here because the driver swaps it per call
+        if warn or stats["total_measurements"] % 10 == 0:
+            sys.stdout.write(
+                f"[MEASUREMENT] #{stats['total_measurements']}: {concentration:.2f} ppm [{level}] - Trend: {trend}\n"
+                f"[STATS] Stats: avg={stats['avg_concentration']:.1f}, min={stats['min_concentration']:.1f}, max={stats['max_concentration']:.1f}\n"
+            )
         
         result = {
             "processed": True,
-            "measurement_number": state.statistics["total_measurements"],
+            "measurement_number": stats["total_measurements"],
             "concentration_level": level,
             "trend": trend,
             "statistics": {
                 "current": concentration,
-                "average": round(state.statistics["avg_concentration"], 2),
-                "minimum": state.statistics["min_concentration"],
-                "maximum": state.statistics["max_concentration"],
-                "median": round(median(concentrations), 2) if concentrations else 0,
-                "count": len(concentrations)
+                "average": _round(stats["avg_concentration"], 2),
+                "minimum": stats["min_concentration"],
+                "maximum": stats["max_concentration"],
+                "median": _round(state.median_concentration(), 2),
+                "count": count
             },
-            "timestamp": time.time()
+            "timestamp": now
         }
         
-        # Add warnings for threshold violations
-        if level in ["high", "critical"]:
+        # Add warnings for persistent threshold violations
+        if warn:
             result["warning"] = f"Concentration level is {level} (>{state.thresholds[level]} ppm)"
         
         return result
@@ -134,39 +306,40 @@ def on_measurement(data):
         print(f"[ERROR] Error processing measurement: {e}")
         return {"processed": False, "error": str(e)}
 
-def on_alert(alert):
+def on_alert(alert, _time=time.time):
     """Handle alerts with advanced logic."""
     try:
+        now = _time()
         state.statistics["total_alerts"] += 1
         
         # Add to buffer
-        alert_record = {
-            "type": alert.get("alert_type", "unknown"),
-            "severity": alert.get("severity", "info"),
-            "message": alert.get("message", ""),
-            "timestamp": alert.get("timestamp", time.time()),
-            "data": alert.get("data", {})
-        }
+        alert_record = AlertRecord(
+            alert.get("alert_type", "unknown"),
+            alert.get("severity", "info"),
+            alert.get("message", ""),
+            _timestamp_seconds(alert.get("timestamp"), now),
+            alert.get("data", {})
+        )
+        if len(state.alerts) == state.alerts.maxlen and state.alert_head > 0:
+            state.alert_head -= 1              # The append below drops the oldest alert
         state.alerts.append(alert_record)
         
-        severity = alert_record["severity"]
+        severity = alert_record.severity
         
         # Severity-based responses
-        icons = {
-            "info": "[INFO]",
-            "warning": "[WARN]", 
-            "critical": "[CRIT]"
-        }
+        icon = _ALERT_ICONS.get(severity, "[UNKN]")
+        log = f"{icon} ALERT #{state.statistics['total_alerts']}: {severity.upper()} - {alert_record.message}\n"
         
-        icon = icons.get(severity, "[UNKN]")
-        print(f"{icon} ALERT #{state.statistics['total_alerts']}: {severity.upper()} - {alert_record['message']}")
-        
-        # Calculate alert frequency
-        recent_alerts = [a for a in state.alerts if time.time() - a["timestamp"] < 300]  # Last 5 minutes
-        alert_frequency = len(recent_alerts)
+        # Calculate alert frequency over the last 5 minutes: alerts arrive in time
+        # order, so only the start of that window has to move forward
+        alerts = state.alerts
+        while state.alert_head < len(alerts) and now - alerts[state.alert_head].timestamp >= 300:
+            state.alert_head += 1
+        alert_frequency = len(alerts) - state.alert_head
         
         if alert_frequency > 5:
-            print("[WARNING] High alert frequency detected - possible system issue!")
+            log += "[WARNING] High alert frequency detected - possible system issue!\n"
+        sys.stdout.write(log)
         
         # Advanced response logic
         response = {
@@ -175,17 +348,13 @@ def on_alert(alert):
             "severity": severity,
             "response_time_ms": 50,  # Simulated response time
             "alert_frequency_5min": alert_frequency,
-            "timestamp": time.time()
+            "timestamp": now
         }
         
         # Add specific actions based on alert type
-        alert_type = alert_record["type"]
-        if alert_type == "concentration_high":
-            response["actions"] = ["increase_ventilation", "notify_operators"]
-        elif alert_type == "sensor_fault":
-            response["actions"] = ["switch_backup_sensor", "schedule_maintenance"]
-        elif alert_type == "calibration_needed":
-            response["actions"] = ["initiate_cal_sequence", "log_drift_data"]
+        actions = _ALERT_ACTIONS.get(alert_record.type)
+        if actions:
+            response["actions"] = list(actions)
         
         return response
         
@@ -196,6 +365,7 @@ def on_alert(alert):
 def clear_action():
     """Clear action with data preservation."""
     try:
+        now = time.time()
         print("[CLEAR] Clearing action - preserving historical data")
         
         # Preserve statistics but reset active counters
@@ -203,7 +373,7 @@ def clear_action():
             "total_measurements_before_clear": state.statistics["total_measurements"],
             "total_alerts_before_clear": state.statistics["total_alerts"],
             "avg_concentration_before_clear": state.statistics["avg_concentration"],
-            "clear_timestamp": time.time()
+            "clear_timestamp": now
         }
         
         # Keep data in buffers but reset counters
@@ -214,27 +384,33 @@ def clear_action():
         return {
             "cleared": True,
             "preserved_stats": preserved_stats,
-            "measurements_in_buffer": len(state.measurements),
+            "measurements_in_buffer": state.count,
             "alerts_in_buffer": len(state.alerts),
-            "timestamp": time.time()
+            "timestamp": now
         }
         
     except Exception as e:
         print(f"[ERROR] Error during clear: {e}")
         return {"cleared": False, "error": str(e)}
 
-def get_status():
+def get_status(_time=time.time, _monotonic=time.monotonic):
     """Get comprehensive status information."""
     try:
-        uptime = time.time() - (state.start_time or time.time())
+        # Wall-clock time for the buffered timestamps, monotonic time for uptime
+        now = _time()
+        elapsed = _monotonic()
+        uptime = elapsed - (state.start_time or elapsed)
+        
+        stats = state.statistics
         
-        # Calculate rates
-        measurement_rate = state.statistics["total_measurements"] / max(uptime, 1) * 60  # per minute
-        alert_rate = state.statistics["total_alerts"] / max(uptime, 1) * 60  # per minute
+        # Calculate rates per minute (over at least one second of uptime)
+        per_minute = 60.0 / uptime if uptime > 1.0 else 60.0
+        measurement_rate = stats["total_measurements"] * per_minute
+        alert_rate = stats["total_alerts"] * per_minute
         
         # Recent activity
-        recent_measurements = len([m for m in state.measurements if time.time() - m["timestamp"] < 60])
-        recent_alerts = len([a for a in state.alerts if time.time() - a["timestamp"] < 60])
+        recent_measurements = int(np.count_nonzero(now - state.timestamps[:state.count] < 60))
+        recent_alerts = len([a for a in state.alerts if now - a.timestamp < 60])
         
         status = {
             "driver_status": "active",
@@ -246,30 +422,41 @@ def get_status():
                 "recent_measurements_1min": recent_measurements,
                 "recent_alerts_1min": recent_alerts
             },
-            "statistics": state.statistics.copy(),
+            # Encoded right away, so the live dicts need no defensive copy
+            "statistics": stats,
             "buffers": {
-                "measurements_count": len(state.measurements),
-                "measurements_capacity": state.measurements.maxlen,
+                "measurements_count": state.count,
+                "measurements_capacity": state.capacity,
                 "alerts_count": len(state.alerts),
                 "alerts_capacity": state.alerts.maxlen
             },
-            "thresholds": state.thresholds.copy(),
+            "thresholds": state.thresholds,
             "health": "good" if alert_rate < 1.0 else "degraded",
-            "timestamp": time.time()
+            "timestamp": now
         }
         
-        return json.dumps(status, indent=2)
+        return _dumps(status)
         
     except Exception as e:
         print(f"[ERROR] Error getting status: {e}")
-        return json.dumps({"status": "error", "error": str(e)})
+        return _dumps({"status": "error", "error": str(e)})
 
-def shutdown():
+def shutdown(_time=time.time, _monotonic=time.monotonic):
     """Graceful shutdown with final reporting."""
     try:
+        now = _time()
         print("[SHUTDOWN] Advanced Python script shutting down...")
         
-        uptime = time.time() - (state.start_time or time.time())
+        elapsed = _monotonic()
+        uptime = elapsed - (state.start_time or elapsed)
+        
+        # Measurements are buffered in arrival order, so the oldest one sits at
+        # `head` once the ring has wrapped (slot 0 before) and the newest just before it
+        oldest_measurement = newest_measurement = None
+        if state.count:
+            oldest_slot = state.head if state.count == state.capacity else 0
+            oldest_measurement = float(state.timestamps[oldest_slot])
+            newest_measurement = float(state.timestamps[state.head - 1])
         
         # Generate final report
         final_report = {
@@ -278,17 +465,18 @@ def shutdown():
                 "uptime_seconds": round(uptime, 2),
                 "total_measurements": state.statistics["total_measurements"],
                 "total_alerts": state.statistics["total_alerts"],
-                "final_statistics": state.statistics.copy(),
+                # The driver converts the report to JSON on return, so no copy is needed
+                "final_statistics": state.statistics,
                 "peak_concentration": state.statistics.get("max_concentration"),
                 "average_concentration": round(state.statistics.get("avg_concentration", 0), 2)
             },
             "data_summary": {
-                "measurements_in_buffer": len(state.measurements),
+                "measurements_in_buffer": state.count,
                 "alerts_in_buffer": len(state.alerts),
-                "oldest_measurement": min([m["timestamp"] for m in state.measurements]) if state.measurements else None,
-                "newest_measurement": max([m["timestamp"] for m in state.measurements]) if state.measurements else None
+                "oldest_measurement": oldest_measurement,
+                "newest_measurement": newest_measurement
             },
-            "shutdown_timestamp": time.time()
+            "shutdown_timestamp": now
         }
         
         print(f"[REPORT] Final Report:")
@@ -303,18 +491,10 @@ def shutdown():
         print(f"[ERROR] Error during shutdown: {e}")
         return {"shutdown": "error", "error": str(e)}
 
-def get_concentration_level(concentration):
+def get_concentration_level(concentration, _bisect=bisect_right):
     """Classify concentration level based on thresholds."""
-    if concentration >= state.thresholds["critical"]:
-        return "critical"
-    elif concentration >= state.thresholds["high"]:
-        return "high"
-    elif concentration >= state.thresholds["medium"]:
-        return "medium"
-    elif concentration >= state.thresholds["low"]:
-        return "low"
-    else:
-        return "normal"
+    # Levels are ordered by threshold: the level is the highest one reached
+    return state.threshold_levels[_bisect(state.threshold_values, concentration)]
 
 # Self-test functionality
 def test_advanced_features():
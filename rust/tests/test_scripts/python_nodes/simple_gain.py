@@ -15,12 +15,40 @@ SCTG Development Non-Commercial License v1.0 (see LICENSE.md for details).
 """
 
 import json
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional, NumPy applies the gain without it
+    njit = None
+    prange = range
 
 # Configuration
 GAIN_FACTOR = 2.0  # 2x amplification by default
+# Gain in decibels, for status reports
+GAIN_DB = 20.0 * math.log10(GAIN_FACTOR) if GAIN_FACTOR > 0 else float('-inf')
+# Frames with at least this many samples are scaled by the parallel Numba kernel
+NUMBA_MIN_SAMPLES = 65536
+
+def _scale_in_place(x, gain):
+    for i in prange(x.shape[0]):
+        x[i] *= gain
+
+# Compiled on first use and kept across the node's per-call re-executions;
+# recompiled only if the kernel itself was edited before a script reload
+_gain_kernel = globals().get("_gain_kernel")
+if njit is not None and (
+    _gain_kernel is None or _gain_kernel.py_func.__code__ != _scale_in_place.__code__
+):
+    _gain_kernel = njit(fastmath=True, parallel=True, boundscheck=False)(_scale_in_place)
 
 def initialize():
     """Initialize the gain node"""
+    # Compile the gain kernel now rather than on the first long frame
+    if _gain_kernel is not None:
+        _gain_kernel(np.zeros(16, dtype=np.float32), np.float32(1.0))
     print(f"Gain node initialized with factor: {GAIN_FACTOR}")
     return {
         "status": "initialized", 
@@ -28,9 +56,65 @@ def initialize():
         "gain_factor": GAIN_FACTOR
     }
 
+def _scale(gained, gain):
+    """Multiply a contiguous float32 array by gain in place"""
+    if _gain_kernel is not None and gained.size >= NUMBA_MIN_SAMPLES:
+        _gain_kernel(gained.reshape(-1), np.float32(gain))
+    else:
+        gained *= np.float32(gain)
+
 def apply_gain(samples, gain=GAIN_FACTOR):
-    """Apply gain to a list of samples"""
-    return [sample * gain for sample in samples]
+    """Apply gain to a list or array of samples, returning a new float32 array"""
+    gained = np.array(samples, dtype=np.float32)
+    _scale(gained, gain)
+    return gained
+
+def apply_gain_stereo(channel_a, channel_b, gain=GAIN_FACTOR):
+    """Apply gain to both channels with a single multiply when they have the same length"""
+    if len(channel_a) != len(channel_b):
+        return apply_gain(channel_a, gain), apply_gain(channel_b, gain)
+    gained = np.array((channel_a, channel_b), dtype=np.float32)
+    _scale(gained, gain)
+    return gained[0], gained[1]
+
+def _single_channel(data):
+    return {
+        "type": "SingleChannel",
+        "samples": apply_gain(data["samples"]),
+        "sample_rate": data["sample_rate"],
+        "timestamp": data["timestamp"],
+        "frame_number": data["frame_number"]
+    }
+
+def _dual_channel(data):
+    # AudioFrame and DualChannel share this handler; the input type is kept
+    channel_a, channel_b = apply_gain_stereo(data["channel_a"], data["channel_b"])
+    return {
+        "type": data["type"],
+        "channel_a": channel_a,
+        "channel_b": channel_b,
+        "sample_rate": data["sample_rate"],
+        "timestamp": data["timestamp"],
+        "frame_number": data["frame_number"]
+    }
+
+def _photoacoustic_result(data):
+    return {
+        "type": "PhotoacousticResult",
+        "signal": apply_gain(data["signal"]),
+        "metadata": data["metadata"]  # Preserve metadata unchanged
+    }
+
+# Fields holding sample arrays in the processed data
+_SAMPLE_FIELDS = ("samples", "channel_a", "channel_b", "signal")
+
+# Handler for each supported data type
+_HANDLERS = {
+    "SingleChannel": _single_channel,
+    "DualChannel": _dual_channel,
+    "AudioFrame": _dual_channel,
+    "PhotoacousticResult": _photoacoustic_result,
+}
 
 def process_data(data):
     """
@@ -40,62 +124,24 @@ def process_data(data):
         data: Dictionary containing the processing data
         
     Returns:
-        Dictionary with gained data in the same format
+        Dictionary with gained data in the same format. The sample fields
+        ("samples", "channel_a", "channel_b", "signal") are float32 NumPy
+        arrays, which the PythonNode reads through the buffer protocol;
+        use process_data_list when plain lists are needed
     """
-    data_type = data.get("type")
-    
-    if data_type == "SingleChannel":
-        samples = data["samples"]
-        gained_samples = apply_gain(samples)
-        
-        return {
-            "type": "SingleChannel",
-            "samples": gained_samples,
-            "sample_rate": data["sample_rate"],
-            "timestamp": data["timestamp"],
-            "frame_number": data["frame_number"]
-        }
-    
-    elif data_type == "DualChannel":
-        channel_a = apply_gain(data["channel_a"])
-        channel_b = apply_gain(data["channel_b"])
-        
-        return {
-            "type": "DualChannel",
-            "channel_a": channel_a,
-            "channel_b": channel_b,
-            "sample_rate": data["sample_rate"],
-            "timestamp": data["timestamp"],
-            "frame_number": data["frame_number"]
-        }
-    
-    elif data_type == "AudioFrame":
-        channel_a = apply_gain(data["channel_a"])
-        channel_b = apply_gain(data["channel_b"])
-        
-        # Return as AudioFrame to maintain format
-        return {
-            "type": "AudioFrame",
-            "channel_a": channel_a,
-            "channel_b": channel_b,
-            "sample_rate": data["sample_rate"],
-            "timestamp": data["timestamp"],
-            "frame_number": data["frame_number"]
-        }
-    
-    elif data_type == "PhotoacousticResult":
-        # Apply gain to the signal data
-        signal_data = data["signal"]
-        gained_signal = apply_gain(signal_data)
-        
-        return {
-            "type": "PhotoacousticResult",
-            "signal": gained_signal,
-            "metadata": data["metadata"]  # Preserve metadata unchanged
-        }
-    
+    handler = _HANDLERS.get(data.get("type"))
     # Pass through unknown types unchanged
-    return data
+    return handler(data) if handler is not None else data
+
+def process_data_list(data):
+    """Same as process_data, with the sample fields converted to lists for callers that need them"""
+    result = process_data(data)
+    if result is data:
+        return result
+    for field in _SAMPLE_FIELDS:
+        if field in result:
+            result[field] = result[field].tolist()
+    return result
 
 def get_status():
     """Return current gain node status"""
@@ -103,7 +149,7 @@ def get_status():
         "status": "active",
         "type": "gain_node", 
         "gain_factor": GAIN_FACTOR,
-        "gain_db": 20 * (GAIN_FACTOR ** 0.5) if GAIN_FACTOR > 0 else float('-inf')
+        "gain_db": GAIN_DB
     }
 
 def shutdown():